@@ -0,0 +1,27 @@
+"""Add file resume position to ETL checkpoints
+
+Revision ID: 002_checkpoint_file_position
+Revises: 001_initial
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_checkpoint_file_position'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('etl_checkpoints', sa.Column('last_byte_offset', sa.BigInteger(), nullable=True))
+    op.add_column('etl_checkpoints', sa.Column('last_row_number', sa.Integer(), nullable=True))
+    op.add_column('etl_checkpoints', sa.Column('last_file_fingerprint', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('etl_checkpoints', 'last_file_fingerprint')
+    op.drop_column('etl_checkpoints', 'last_row_number')
+    op.drop_column('etl_checkpoints', 'last_byte_offset')
@@ -0,0 +1,45 @@
+"""Add raw payload content hashes for unchanged-payload dedupe
+
+Revision ID: 003_raw_content_hash
+Revises: 002_checkpoint_file_position
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_raw_content_hash'
+down_revision = '002_checkpoint_file_position'
+branch_labels = None
+depends_on = None
+
+RAW_TABLES = [
+    ('raw_coinpaprika', 'idx_coinpaprika_content_hash'),
+    ('raw_coingecko', 'idx_coingecko_content_hash'),
+    ('raw_csv_source', 'idx_csv_content_hash'),
+]
+
+
+def upgrade() -> None:
+    for table, index in RAW_TABLES:
+        op.add_column(table, sa.Column('content_hash', sa.String(length=64), nullable=True))
+        op.create_index(index, table, ['content_hash'])
+    
+    op.create_table(
+        'raw_record_hashes',
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('record_key', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('raw_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('source', 'record_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('raw_record_hashes')
+    
+    for table, index in reversed(RAW_TABLES):
+        op.drop_index(index, table_name=table)
+        op.drop_column(table, 'content_hash')
@@ -0,0 +1,69 @@
+"""Add canonical coins, source mappings and price history
+
+Revision ID: 004_canonical_coins
+Revises: 003_raw_content_hash
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_canonical_coins'
+down_revision = '003_raw_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'coins',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_coins_id', 'coins', ['id'])
+    op.create_index('ix_coins_symbol', 'coins', ['symbol'], unique=True)
+    
+    op.create_table(
+        'coin_source_mappings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('coin_id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('source_id', sa.String(), nullable=False),
+        sa.Column('source_symbol', sa.String(), nullable=True),
+        sa.Column('source_name', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_seen', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['coin_id'], ['coins.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_coin_source_mappings_id', 'coin_source_mappings', ['id'])
+    op.create_index('ix_coin_source_mappings_coin_id', 'coin_source_mappings', ['coin_id'])
+    op.create_index('idx_coin_mappings_source_id', 'coin_source_mappings', ['source', 'source_id'], unique=True)
+    
+    op.create_table(
+        'asset_prices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('coin_id', sa.Integer(), nullable=False),
+        sa.Column('price_usd', sa.Float(), nullable=False),
+        sa.Column('market_cap_usd', sa.Float(), nullable=True),
+        sa.Column('volume_24h_usd', sa.Float(), nullable=True),
+        sa.Column('percent_change_24h', sa.Float(), nullable=True),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('source_timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['coin_id'], ['coins.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_asset_prices_id', 'asset_prices', ['id'])
+    op.create_index('idx_asset_prices_coin_fetched', 'asset_prices', ['coin_id', 'fetched_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('asset_prices')
+    op.drop_table('coin_source_mappings')
+    op.drop_table('coins')
@@ -0,0 +1,40 @@
+"""Add symbol alias table
+
+Revision ID: 005_symbol_aliases
+Revises: 004_canonical_coins
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_symbol_aliases'
+down_revision = '004_canonical_coins'
+branch_labels = None
+depends_on = None
+
+# Aliases previously hard-coded in CoinNormalizationService.SYMBOL_ALIASES
+SEED_ALIASES = [
+    ('BITCOIN', 'BTC'),
+    ('XBT', 'BTC'),
+    ('ETHEREUM', 'ETH'),
+    ('TETHER', 'USDT'),
+]
+
+
+def upgrade() -> None:
+    symbol_aliases = op.create_table(
+        'symbol_aliases',
+        sa.Column('alias', sa.String(), nullable=False),
+        sa.Column('canonical', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('alias')
+    )
+    op.create_index('ix_symbol_aliases_canonical', 'symbol_aliases', ['canonical'])
+    op.bulk_insert(symbol_aliases, [{'alias': alias, 'canonical': canonical} for alias, canonical in SEED_ALIASES])
+
+
+def downgrade() -> None:
+    op.drop_table('symbol_aliases')
@@ -0,0 +1,104 @@
+"""Range-partition asset_prices by fetched_at
+
+Revision ID: 006_partition_asset_prices
+Revises: 005_symbol_aliases
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from datetime import date, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_partition_asset_prices'
+down_revision = '005_symbol_aliases'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    'id, coin_id, price_usd, market_cap_usd, volume_24h_usd, '
+    'percent_change_24h, source, source_timestamp, fetched_at'
+)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE asset_prices RENAME TO asset_prices_legacy')
+    op.execute('ALTER INDEX idx_asset_prices_coin_fetched RENAME TO idx_asset_prices_legacy_coin_fetched')
+    op.execute('ALTER SEQUENCE asset_prices_id_seq OWNED BY NONE')
+    op.execute('ALTER SEQUENCE asset_prices_id_seq AS BIGINT')
+    op.execute('ALTER TABLE asset_prices_legacy DROP CONSTRAINT asset_prices_pkey')
+
+    op.execute("""
+        CREATE TABLE asset_prices (
+            id BIGINT NOT NULL DEFAULT nextval('asset_prices_id_seq'),
+            coin_id INTEGER NOT NULL REFERENCES coins (id),
+            price_usd FLOAT NOT NULL,
+            market_cap_usd FLOAT,
+            volume_24h_usd FLOAT,
+            percent_change_24h FLOAT,
+            source VARCHAR NOT NULL,
+            source_timestamp TIMESTAMP WITH TIME ZONE,
+            fetched_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, fetched_at)
+        ) PARTITION BY RANGE (fetched_at)
+    """)
+    op.execute('ALTER SEQUENCE asset_prices_id_seq OWNED BY asset_prices.id')
+    op.create_index('idx_asset_prices_coin_fetched', 'asset_prices', ['coin_id', 'fetched_at'])
+    op.execute('CREATE TABLE asset_prices_default PARTITION OF asset_prices DEFAULT')
+
+    # Monthly partitions covering existing history and the current month, then copy rows over
+    first, last = bind.execute(sa.text('SELECT min(fetched_at), max(fetched_at) FROM asset_prices_legacy')).one()
+    today = date.today()
+    month = _month_start(first.date() if first else today)
+    end = _next_month(max(last.date() if last else today, today))
+    while month < end:
+        op.execute(
+            f"CREATE TABLE asset_prices_p{month:%Y_%m} PARTITION OF asset_prices "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_next_month(month).isoformat()} 00:00:00+00')"
+        )
+        month = _next_month(month)
+
+    op.execute(f'INSERT INTO asset_prices ({COLUMNS}) SELECT {COLUMNS} FROM asset_prices_legacy')
+    op.execute('DROP TABLE asset_prices_legacy')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE asset_prices RENAME TO asset_prices_partitioned')
+    op.execute('ALTER INDEX idx_asset_prices_coin_fetched RENAME TO idx_asset_prices_partitioned_coin_fetched')
+    op.execute('ALTER SEQUENCE asset_prices_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE asset_prices_partitioned DROP CONSTRAINT asset_prices_pkey')
+    op.execute("""
+        CREATE TABLE asset_prices (
+            id INTEGER NOT NULL DEFAULT nextval('asset_prices_id_seq'),
+            coin_id INTEGER NOT NULL REFERENCES coins (id),
+            price_usd FLOAT NOT NULL,
+            market_cap_usd FLOAT,
+            volume_24h_usd FLOAT,
+            percent_change_24h FLOAT,
+            source VARCHAR NOT NULL,
+            source_timestamp TIMESTAMP WITH TIME ZONE,
+            fetched_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute('ALTER SEQUENCE asset_prices_id_seq OWNED BY asset_prices.id')
+    op.create_index('ix_asset_prices_id', 'asset_prices', ['id'])
+    op.create_index('idx_asset_prices_coin_fetched', 'asset_prices', ['coin_id', 'fetched_at'])
+    op.execute(f'INSERT INTO asset_prices ({COLUMNS}) SELECT {COLUMNS} FROM asset_prices_partitioned')
+    op.execute('DROP TABLE asset_prices_partitioned')
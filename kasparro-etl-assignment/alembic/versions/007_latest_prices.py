@@ -0,0 +1,52 @@
+"""Add latest_prices (current price per coin and source)
+
+Revision ID: 007_latest_prices
+Revises: 006_partition_asset_prices
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_latest_prices'
+down_revision = '006_partition_asset_prices'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    'coin_id, source, price_usd, market_cap_usd, volume_24h_usd, '
+    'percent_change_24h, source_timestamp, fetched_at'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'latest_prices',
+        sa.Column('coin_id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('price_usd', sa.Float(), nullable=False),
+        sa.Column('market_cap_usd', sa.Float(), nullable=True),
+        sa.Column('volume_24h_usd', sa.Float(), nullable=True),
+        sa.Column('percent_change_24h', sa.Float(), nullable=True),
+        sa.Column('source_timestamp', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['coin_id'], ['coins.id']),
+        sa.PrimaryKeyConstraint('coin_id', 'source')
+    )
+    
+    # Backfill from history (same query as app.services.latest_prices.rebuild_latest_prices)
+    op.execute(f"""
+        INSERT INTO latest_prices ({COLUMNS})
+        SELECT {COLUMNS} FROM (
+            SELECT {COLUMNS}, row_number() OVER (
+                PARTITION BY coin_id, source ORDER BY fetched_at DESC, id DESC
+            ) AS rank
+            FROM asset_prices
+        ) ranked
+        WHERE rank = 1
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('latest_prices')
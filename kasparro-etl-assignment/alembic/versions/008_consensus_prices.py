@@ -0,0 +1,37 @@
+"""Add assets.volume_24h and consensus_prices
+
+Revision ID: 008_consensus_prices
+Revises: 007_latest_prices
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_consensus_prices'
+down_revision = '007_latest_prices'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('assets', sa.Column('volume_24h', sa.Float(), nullable=True))
+    op.create_table(
+        'consensus_prices',
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('median_price_usd', sa.Float(), nullable=False),
+        sa.Column('vwap_price_usd', sa.Float(), nullable=False),
+        sa.Column('min_price_usd', sa.Float(), nullable=False),
+        sa.Column('max_price_usd', sa.Float(), nullable=False),
+        sa.Column('spread_pct', sa.Float(), nullable=False),
+        sa.Column('source_count', sa.Integer(), nullable=False),
+        sa.Column('total_volume_24h', sa.Float(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('symbol')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('consensus_prices')
+    op.drop_column('assets', 'volume_24h')
@@ -0,0 +1,41 @@
+"""Add price_candles (incremental OHLC rollups of price history)
+
+Revision ID: 009_price_candles
+Revises: 008_consensus_prices
+Create Date: 2026-10-18 00:00:00.000000
+
+Existing history is not rolled up here; run app.services.candles.rebuild_candles
+once after upgrading to backfill it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_price_candles'
+down_revision = '008_consensus_prices'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_candles',
+        sa.Column('coin_id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('resolution', sa.String(length=2), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('open_usd', sa.Float(), nullable=False),
+        sa.Column('high_usd', sa.Float(), nullable=False),
+        sa.Column('low_usd', sa.Float(), nullable=False),
+        sa.Column('close_usd', sa.Float(), nullable=False),
+        sa.Column('volume_24h_usd', sa.Float(), nullable=True),
+        sa.Column('tick_count', sa.Integer(), nullable=False),
+        sa.Column('open_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('close_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['coin_id'], ['coins.id']),
+        sa.PrimaryKeyConstraint('coin_id', 'source', 'resolution', 'bucket_start')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('price_candles')
@@ -0,0 +1,96 @@
+"""Store raw payloads as JSONB with extracted, indexed key columns
+
+Revision ID: 010_jsonb_raw_payloads
+Revises: 009_price_candles
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_jsonb_raw_payloads'
+down_revision = '009_price_candles'
+branch_labels = None
+depends_on = None
+
+RAW_TABLES = [
+    ('raw_coinpaprika', 'coinpaprika'),
+    ('raw_coingecko', 'coingecko'),
+    ('raw_csv_source', 'csv'),
+]
+
+# Mirrors parse_source_timestamp: JSON numbers are epoch seconds, ISO 8601
+# strings are cast with naive values read as UTC, anything else (including
+# strings that look like dates but are not, e.g. month 13) becomes NULL
+# instead of aborting the migration
+PARSE_TIMESTAMP_FUNCTION = """
+    CREATE FUNCTION pg_temp.parse_source_timestamp(value jsonb) RETURNS timestamptz AS $$
+    BEGIN
+        IF jsonb_typeof(value) = 'number' THEN
+            RETURN to_timestamp((value #>> '{}')::double precision);
+        ELSIF jsonb_typeof(value) = 'string'
+            AND value #>> '{}' ~ '^\\d{4}-\\d{2}-\\d{2}([T ]\\d{2}:\\d{2}(:\\d{2}(\\.\\d+)?)?)?(Z|[+-]\\d{2}(:?\\d{2})?)?$'
+        THEN
+            RETURN (value #>> '{}')::timestamptz;
+        END IF;
+        RETURN NULL;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql SET timezone = 'UTC'
+"""
+
+# Same extraction as IngestionSource.raw_key_columns / CSVSource.raw_key_columns
+API_BACKFILL = """
+    UPDATE {table} SET
+        source_record_id = payload->>'id',
+        symbol = upper(nullif(payload->>'symbol', '')),
+        source_timestamp = pg_temp.parse_source_timestamp(payload->'last_updated')
+"""
+CSV_BACKFILL = """
+    UPDATE raw_csv_source SET
+        source_record_id = upper(coalesce(
+            nullif(payload->>'symbol', ''), nullif(payload->>'Symbol', ''), nullif(payload->>'SYMBOL', '')
+        )),
+        symbol = upper(coalesce(
+            nullif(payload->>'symbol', ''), nullif(payload->>'Symbol', ''), nullif(payload->>'SYMBOL', '')
+        ))
+"""
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    if is_postgresql:
+        op.execute(PARSE_TIMESTAMP_FUNCTION)
+    
+    for table, prefix in RAW_TABLES:
+        if is_postgresql:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN payload TYPE JSONB USING payload::jsonb')
+        op.add_column(table, sa.Column('source_record_id', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('symbol', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('source_timestamp', sa.DateTime(timezone=True), nullable=True))
+        
+        if is_postgresql:
+            op.execute(CSV_BACKFILL if table == 'raw_csv_source' else API_BACKFILL.format(table=table))
+        
+        op.create_index(f'idx_{prefix}_record_fetched', table, ['source_record_id', 'fetched_at'])
+        op.create_index(f'idx_{prefix}_symbol_fetched', table, ['symbol', 'fetched_at'])
+        op.create_index(f'idx_{prefix}_source_timestamp', table, ['source_timestamp'])
+    
+    if is_postgresql:
+        op.execute('DROP FUNCTION pg_temp.parse_source_timestamp(jsonb)')
+
+
+def downgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    
+    for table, prefix in reversed(RAW_TABLES):
+        op.drop_index(f'idx_{prefix}_source_timestamp', table_name=table)
+        op.drop_index(f'idx_{prefix}_symbol_fetched', table_name=table)
+        op.drop_index(f'idx_{prefix}_record_fetched', table_name=table)
+        op.drop_column(table, 'source_timestamp')
+        op.drop_column(table, 'symbol')
+        op.drop_column(table, 'source_record_id')
+        if is_postgresql:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN payload TYPE JSON USING payload::json')
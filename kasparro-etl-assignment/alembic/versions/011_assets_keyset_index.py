@@ -0,0 +1,25 @@
+"""Replace the assets updated_at index with (updated_at, asset_id) for keyset pagination
+
+Revision ID: 011_assets_keyset_index
+Revises: 010_jsonb_raw_payloads
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_assets_keyset_index'
+down_revision = '010_jsonb_raw_payloads'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_assets_updated_id', 'assets', ['updated_at', 'asset_id'])
+    op.drop_index('idx_assets_updated', table_name='assets')
+
+
+def downgrade() -> None:
+    op.create_index('idx_assets_updated', 'assets', ['updated_at'])
+    op.drop_index('idx_assets_updated_id', table_name='assets')
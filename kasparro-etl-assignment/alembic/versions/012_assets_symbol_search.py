@@ -0,0 +1,31 @@
+"""Trigram and prefix indexes for assets.symbol search
+
+Revision ID: 012_assets_symbol_search
+Revises: 011_assets_keyset_index
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012_assets_symbol_search'
+down_revision = '011_assets_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX IF NOT EXISTS idx_assets_symbol_trgm ON assets USING gin (symbol gin_trgm_ops)')
+    op.execute('CREATE INDEX IF NOT EXISTS idx_assets_symbol_pattern ON assets (symbol text_pattern_ops)')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('DROP INDEX IF EXISTS idx_assets_symbol_pattern')
+    op.execute('DROP INDEX IF EXISTS idx_assets_symbol_trgm')
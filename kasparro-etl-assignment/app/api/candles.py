@@ -0,0 +1,64 @@
+"""OHLC candle endpoints served from the price_candles rollups."""
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from app.core.db import get_db
+from app.schemas.candles import CandleListResponse, CandleResponse
+from app.services.candles import as_naive_utc, get_candles
+from app.services.normalization import CoinNormalizationService
+from app.core.logging import logger
+
+router = APIRouter()
+
+
+# Plain def: the candle services use the sync Session, so FastAPI runs this in its threadpool
+@router.get("/candles", response_model=CandleListResponse)
+def get_candle_series(
+    symbol: str = Query(...),
+    source: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    interval: Optional[Literal["1m", "1h", "1d"]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Get OHLC candles for a coin in [start, end) (default: the last 24 hours).
+    Without an interval the finest rollup that fits the range is used; without
+    a source, the source with the most recent price for the coin.
+    """
+    request_id = str(uuid.uuid4())
+    start_time = time.time()
+    
+    # Query bounds may carry an offset; the rollups are stored in naive UTC
+    end = as_naive_utc(end) if end else datetime.utcnow()
+    start = as_naive_utc(start) if start else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    coin = CoinNormalizationService.get_coin_by_symbol(db, symbol)
+    if coin is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol: {symbol}")
+    if source is None:
+        latest = CoinNormalizationService.get_latest_price(db, coin.id)
+        if latest is None:
+            raise HTTPException(status_code=404, detail=f"No prices for {coin.symbol}")
+        source = latest.source
+    
+    try:
+        resolution, candles = get_candles(db, coin.id, source, start, end, interval)
+        return CandleListResponse(
+            request_id=request_id,
+            api_latency_ms=(time.time() - start_time) * 1000,
+            symbol=coin.symbol,
+            source=source,
+            interval=resolution,
+            start=start,
+            end=end,
+            data=[CandleResponse.model_validate(candle) for candle in candles],
+        )
+    except Exception as e:
+        logger.error(f"Error fetching candles: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
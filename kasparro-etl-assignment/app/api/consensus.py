@@ -0,0 +1,53 @@
+"""Cross-source consensus price endpoints."""
+import time
+import uuid
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.async_db import get_async_db
+from app.core.models import ConsensusPrice
+from app.schemas.consensus import ConsensusListResponse, ConsensusResponse
+from app.services.symbol_resolver import symbol_resolver
+from app.core.logging import logger
+
+router = APIRouter()
+
+
+@router.get("/consensus", response_model=ConsensusListResponse)
+async def get_consensus(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
+    symbol: Optional[str] = Query(None),
+    min_sources: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get consensus prices, optionally for one symbol or only those quoted by several sources."""
+    request_id = str(uuid.uuid4())
+    start_time = time.time()
+    
+    try:
+        query = select(ConsensusPrice)
+        
+        if symbol:
+            query = query.where(ConsensusPrice.symbol == symbol_resolver.resolve(symbol))
+        
+        if min_sources > 1:
+            query = query.where(ConsensusPrice.source_count >= min_sources)
+        
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        
+        offset = (page - 1) * page_size
+        rows = (await db.scalars(query.order_by(ConsensusPrice.symbol).offset(offset).limit(page_size))).all()
+        
+        return ConsensusListResponse(
+            request_id=request_id,
+            api_latency_ms=(time.time() - start_time) * 1000,
+            data=[ConsensusResponse.model_validate(row) for row in rows],
+            total=total,
+            page=page,
+            page_size=page_size,
+        )
+    except Exception as e:
+        logger.error(f"Error fetching consensus prices: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,10 @@
 """Health check endpoint."""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.core.db import get_db
+from app.core.async_db import get_async_db
+from app.core.models import ETLCheckpoint
 from app.services.etl_runner import ETLRunner
 from app.core.logging import logger
 
@@ -11,11 +12,11 @@ router = APIRouter()
 
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """Health check endpoint with DB connectivity and ETL status."""
     try:
         # Check DB connectivity
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "healthy"
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -24,15 +25,12 @@ async def health_check(db: Session = Depends(get_db)):
     
     # Get ETL status
     try:
-        etl_runner = ETLRunner(db)
-        etl_stats = etl_runner.get_stats()
+        statuses = (await db.scalars(
+            select(ETLCheckpoint.status).where(ETLCheckpoint.source.in_(ETLRunner.SOURCE_NAMES))
+        )).all()
         
         # Determine overall ETL status
-        etl_status = "healthy"
-        for source_stats in etl_stats.values():
-            if source_stats["status"] == "failed":
-                etl_status = "degraded"
-                break
+        etl_status = "degraded" if "failed" in statuses else "healthy"
         
     except Exception as e:
         logger.error(f"ETL status check failed: {e}")
@@ -44,4 +42,3 @@ async def health_check(db: Session = Depends(get_db)):
         "etl": etl_status,
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
-
@@ -1,60 +1,162 @@
 """Main API routes."""
+import base64
+import binascii
+import json
 import time
 import uuid
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional
-from app.core.db import get_db
+from datetime import datetime
+import orjson
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional, Tuple
+from app.core.async_db import get_async_db
+from app.core.config import settings
 from app.core.models import Asset
 from app.schemas.unified import AssetListResponse, AssetResponse
 from app.core.logging import logger
+from app.services.response_cache import data_response_cache, data_version
 
 router = APIRouter()
 
+# AssetResponse fields in declaration order; /data selects exactly these columns
+ASSET_RESPONSE_FIELDS = tuple(AssetResponse.model_fields)
+ASSET_RESPONSE_COLUMNS = tuple(getattr(Asset, field) for field in ASSET_RESPONSE_FIELDS)
+
+
+def encode_cursor(asset: Asset) -> str:
+    """Opaque cursor for the position right after `asset` (or a /data row) in (updated_at, asset_id) DESC order."""
+    raw = json.dumps([asset.updated_at.isoformat(), asset.asset_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, asset_id = json.loads(raw)
+        return datetime.fromisoformat(updated_at), int(asset_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def dump_asset_list(body: dict) -> bytes:
+    """
+    JSON bytes of an AssetListResponse given as plain values (rows as dicts),
+    without building the models. orjson renders these types exactly as
+    pydantic does, UTC as "Z" included; test_api checks the two stay equal.
+    """
+    return orjson.dumps(body, option=orjson.OPT_UTC_Z)
+
+
+def symbol_filter(symbol: str, match: str):
+    """
+    Symbol condition for the requested match mode. Stored symbols are upper
+    case, so exact and prefix matches compare upper-cased input and can use the
+    btree indexes; contains uses ILIKE, served by the trigram index.
+    """
+    if match == "exact":
+        return Asset.symbol == symbol.upper()
+    escaped = symbol.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    if match == "prefix":
+        return Asset.symbol.like(f"{escaped.upper()}%", escape="\\")
+    return Asset.symbol.ilike(f"%{escaped}%", escape="\\")
+
 
 @router.get("/data", response_model=AssetListResponse)
 async def get_data(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     symbol: Optional[str] = Query(None),
+    match: Literal["exact", "prefix", "contains"] = Query("contains", description="How symbol is matched"),
     source: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous response; replaces page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get paginated asset data with filtering."""
+    """
+    Get asset data with filtering, newest first.
+    
+    With a cursor, the page starts right after the cursor's (updated_at,
+    asset_id) position: an index seek with no OFFSET and no count, so latency
+    does not grow with depth. Without one, the legacy page/page_size mode is
+    used. Both return next_cursor while more rows follow.
+    
+    Responses are cached per normalized query and ETL data version; the
+    X-Cache header reports HIT, MISS or BYPASS (cache disabled).
+    
+    Rows are read as tuples of the response columns and encoded straight to
+    JSON; the body matches AssetListResponse, which stays the documented schema.
+    """
     request_id = str(uuid.uuid4())
     start_time = time.time()
     
+    position = None
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Symbol matching is case-insensitive, so symbol case does not change the result
+    cache_key = (
+        symbol.lower() if symbol else None, match, source or None, page_size, None if cursor else page, cursor,
+    )
+    version = data_version.value
+    if settings.DATA_CACHE_ENABLED:
+        cached = data_response_cache.get(version, cache_key)
+        if cached is not None:
+            body = dump_asset_list({
+                "request_id": request_id,
+                "api_latency_ms": (time.time() - start_time) * 1000,
+                **cached,
+            })
+            return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+    cache_status = "MISS" if settings.DATA_CACHE_ENABLED else "BYPASS"
+    
     try:
         # Build query
-        query = db.query(Asset)
+        query = select(*ASSET_RESPONSE_COLUMNS)
         
         if symbol:
-            query = query.filter(Asset.symbol.ilike(f"%{symbol}%"))
+            query = query.where(symbol_filter(symbol, match))
         
         if source:
-            query = query.filter(Asset.source == source)
+            query = query.where(Asset.source == source)
         
-        # Get total count
-        total = query.count()
+        total = None
+        if position is not None:
+            query = query.where(tuple_(Asset.updated_at, Asset.asset_id) < tuple_(*position))
+        else:
+            # Get total count
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
         
-        # Apply pagination
-        offset = (page - 1) * page_size
-        assets = query.order_by(Asset.updated_at.desc()).offset(offset).limit(page_size).all()
+        query = query.order_by(Asset.updated_at.desc(), Asset.asset_id.desc())
+        if position is None:
+            query = query.offset((page - 1) * page_size)
         
-        # Convert to response models
-        asset_responses = [AssetResponse.model_validate(asset) for asset in assets]
+        # One extra row tells whether another page follows
+        assets = (await db.execute(query.limit(page_size + 1))).all()
+        has_more = len(assets) > page_size
+        assets = assets[:page_size]
+        
+        result = {
+            "data": [dict(zip(ASSET_RESPONSE_FIELDS, row)) for row in assets],
+            "total": total,
+            "page": None if position is not None else page,
+            "page_size": page_size,
+            "next_cursor": encode_cursor(assets[-1]) if has_more else None,
+        }
+        if settings.DATA_CACHE_ENABLED:
+            data_response_cache.put(version, cache_key, result)
         
         api_latency_ms = (time.time() - start_time) * 1000
         
-        return AssetListResponse(
-            request_id=request_id,
-            api_latency_ms=api_latency_ms,
-            data=asset_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-        )
+        body = dump_asset_list({
+            "request_id": request_id,
+            "api_latency_ms": api_latency_ms,
+            **result,
+        })
+        return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
     except Exception as e:
         logger.error(f"Error fetching data: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-
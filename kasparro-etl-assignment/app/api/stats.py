@@ -1,22 +1,28 @@
 """ETL statistics endpoint."""
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.async_db import get_async_db
+from app.core.http import http_pool
+from app.services.identity_cache import coin_identity_cache
+from app.services.response_cache import data_response_cache
+from app.services.checkpoint import checkpoint_summary
 from app.services.etl_runner import ETLRunner
 from app.core.models import ETLCheckpoint
-from sqlalchemy import func
 
 router = APIRouter()
 
 
 @router.get("/stats")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
     """Get ETL statistics."""
-    etl_runner = ETLRunner(db)
-    checkpoint_stats = etl_runner.get_stats()
-    
     # Aggregate stats
-    all_checkpoints = db.query(ETLCheckpoint).all()
+    all_checkpoints = (await db.scalars(select(ETLCheckpoint))).all()
+    by_source = {checkpoint.source: checkpoint for checkpoint in all_checkpoints}
+    checkpoint_stats = {
+        source_name: checkpoint_summary(by_source.get(source_name))
+        for source_name in ETLRunner.SOURCE_NAMES
+    }
     
     # Get last success and failure times
     last_success = None
@@ -41,5 +47,8 @@ async def get_stats(db: Session = Depends(get_db)):
         "last_success": last_success.isoformat() if last_success else None,
         "last_failure": last_failure.isoformat() if last_failure else None,
         "sources": checkpoint_stats,
+        "http": http_pool.metrics.snapshot(),
+        "identity_cache": coin_identity_cache.snapshot(),
+        "data_cache": data_response_cache.snapshot(),
     }
 
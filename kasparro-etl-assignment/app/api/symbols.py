@@ -0,0 +1,37 @@
+"""Symbol autocomplete endpoint served from memory."""
+import time
+import uuid
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import Session
+from app.core.db import get_db
+from app.schemas.unified import SymbolAutocompleteResponse, SymbolSuggestion
+from app.services.symbol_search import symbol_autocomplete
+from app.core.logging import logger
+
+router = APIRouter()
+
+
+# Plain def: a rebuild of the symbol list queries through the sync Session, so FastAPI
+# runs this in its threadpool instead of on the event loop
+@router.get("/symbols/autocomplete", response_model=SymbolAutocompleteResponse)
+def autocomplete_symbols(
+    q: str = Query(..., min_length=1, max_length=32),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """Symbols starting with `q`, alphabetically. Only touches the database after an ETL data change."""
+    request_id = str(uuid.uuid4())
+    start_time = time.time()
+    
+    try:
+        matches = symbol_autocomplete.complete(db, q, limit)
+        
+        return SymbolAutocompleteResponse(
+            request_id=request_id,
+            api_latency_ms=(time.time() - start_time) * 1000,
+            query=q,
+            data=[SymbolSuggestion(symbol=match.symbol, name=match.name) for match in matches],
+        )
+    except Exception as e:
+        logger.error(f"Error completing symbols: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
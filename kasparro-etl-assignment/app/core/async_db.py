@@ -0,0 +1,44 @@
+"""Async database engine and session dependency for the API routes."""
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+
+# asyncio DBAPI driver per backend; the sync engine in app.core.db keeps its driver for the ETL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def async_url(url: str) -> URL:
+    """The same database URL, switched to the backend's asyncio driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_api_engine(url: str, **kwargs) -> AsyncEngine:
+    """
+    Async engine for request handling. Its pool is separate from the ETL's
+    sync pool, so long ETL transactions never starve API requests.
+    """
+    url = async_url(url)
+    if url.get_backend_name() == "postgresql":
+        kwargs.setdefault("pool_size", settings.DB_ASYNC_POOL_SIZE)
+        kwargs.setdefault("max_overflow", settings.DB_ASYNC_MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", settings.DB_ASYNC_POOL_TIMEOUT_SECONDS)
+    return create_async_engine(url, pool_pre_ping=True, **kwargs)
+
+
+async_engine = create_api_engine(settings.DATABASE_URL)
+
+# Objects stay usable after commit; API handlers only read and serialize them
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Dependency for FastAPI to get an async database session."""
+    async with AsyncSessionLocal() as session:
+        yield session
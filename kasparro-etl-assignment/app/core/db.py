@@ -1,7 +1,8 @@
 """Database connection and session management."""
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
 engine = create_engine(
@@ -24,3 +25,16 @@ def get_db():
     finally:
         db.close()
 
+
+
+def get_upsert_insert(db: Session):
+    """
+    Return the dialect-specific insert() supporting ON CONFLICT for the session's
+    bind (PostgreSQL or SQLite), or None if the dialect has no upsert support.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    return None
@@ -0,0 +1,314 @@
+"""Shared pooled HTTP clients for external API sources."""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import httpx
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class HTTPMetrics:
+    """Thread-safe counters splitting request time into connect and transfer time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+            self.connect_seconds = 0.0
+            self.transfer_seconds = 0.0
+
+    def record(self, connect_seconds: float, transfer_seconds: float, new_connection: bool):
+        with self._lock:
+            self.requests += 1
+            self.connect_seconds += connect_seconds
+            self.transfer_seconds += transfer_seconds
+            if new_connection:
+                self.connections_opened += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.requests - self.connections_opened,
+                "connect_seconds": round(self.connect_seconds, 6),
+                "transfer_seconds": round(self.transfer_seconds, 6),
+            }
+
+
+class _RequestTrace:
+    """httpcore trace hook recording TCP/TLS connect time for a single request."""
+
+    def __init__(self, metrics: HTTPMetrics):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self.connect_started: Optional[float] = None
+        self.connect_seconds = 0.0
+        self.new_connection = False
+        self._recorded = False
+
+    def __call__(self, event_name: str, info: dict):
+        self.on_event(event_name)
+
+    def on_event(self, event_name: str):
+        now = time.perf_counter()
+        if event_name.endswith("connect_tcp.started"):
+            self.connect_started = now
+            self.new_connection = True
+        elif event_name.endswith(("connect_tcp.complete", "start_tls.complete")) and self.connect_started:
+            self.connect_seconds = now - self.connect_started
+
+    def finish(self):
+        """Record the request once its response body has been consumed or closed."""
+        if self._recorded:
+            return
+        self._recorded = True
+        total = time.perf_counter() - self.started
+        self.metrics.record(self.connect_seconds, max(total - self.connect_seconds, 0.0), self.new_connection)
+
+
+class _AsyncRequestTrace(_RequestTrace):
+    """Async variant; httpcore requires a coroutine trace hook on async transports."""
+
+    async def __call__(self, event_name: str, info: dict):
+        self.on_event(event_name)
+
+
+class _TimedStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, trace: _RequestTrace):
+        self._stream = stream
+        self._trace = trace
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._trace.finish()
+
+
+class _AsyncTimedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, trace: _RequestTrace):
+        self._stream = stream
+        self._trace = trace
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._trace.finish()
+
+
+class TimedTransport(httpx.BaseTransport):
+    """Transport wrapper that feeds connect/transfer timings into HTTPMetrics."""
+
+    def __init__(self, transport: httpx.BaseTransport, metrics: HTTPMetrics):
+        self._transport = transport
+        self._metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _RequestTrace(self._metrics)
+        request.extensions["trace"] = trace
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            trace.finish()
+            raise
+        response.stream = _TimedStream(response.stream, trace)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncTimedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of TimedTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: HTTPMetrics):
+        self._transport = transport
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _AsyncRequestTrace(self._metrics)
+        request.extensions["trace"] = trace
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            trace.finish()
+            raise
+        response.stream = _AsyncTimedStream(response.stream, trace)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by concurrent requests to one API.
+
+    acquire() blocks until a request may be sent; pause() stops all callers
+    for a while, e.g. when the API answers 429 with a Retry-After header.
+    """
+
+    def __init__(self, requests_per_minute: int, burst: int = 1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Parse a numeric Retry-After header, falling back to `default`."""
+    try:
+        return max(float(response.headers.get("Retry-After", default)), 0.0)
+    except ValueError:
+        return default
+
+
+class ValidatorCache:
+    """
+    Remembers ETag / Last-Modified validators per resource so the next fetch can
+    be a conditional request answered with 304 Not Modified.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        if not settings.HTTP_CONDITIONAL_REQUESTS:
+            return {}
+        with self._lock:
+            etag, last_modified = self._validators.get(key, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    @staticmethod
+    def extract(response: httpx.Response) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return None
+        return etag, last_modified
+
+    def store(self, key: str, validators: Tuple[Optional[str], Optional[str]]):
+        with self._lock:
+            self._validators[key] = validators
+
+    def clear(self):
+        with self._lock:
+            self._validators.clear()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientPool:
+    """
+    Process-wide pooled HTTP clients (sync and async) for API sources.
+
+    Clients are created lazily, keep connections alive between ETL cycles and
+    are closed by the application lifespan.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=keepalive_expiry or settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        self.http2 = settings.HTTP_ENABLE_HTTP2 if http2 is None else http2
+        if self.http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            self.http2 = False
+        self.timeout = timeout or settings.HTTP_TIMEOUT_SECONDS
+        self.metrics = HTTPMetrics()
+        self.validators = ValidatorCache()
+        self._lock = threading.Lock()
+        self._sync_client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                transport = httpx.HTTPTransport(limits=self.limits, http2=self.http2)
+                self._sync_client = httpx.Client(
+                    transport=TimedTransport(transport, self.metrics),
+                    timeout=self.timeout,
+                )
+            return self._sync_client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_client is None or self._async_client.is_closed:
+                transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+                self._async_client = httpx.AsyncClient(
+                    transport=AsyncTimedTransport(transport, self.metrics),
+                    timeout=self.timeout,
+                )
+            return self._async_client
+
+    def close(self):
+        """Close the sync client (the async client must be closed with aclose)."""
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
+
+    async def aclose(self):
+        """Close both clients."""
+        self.close()
+        with self._lock:
+            client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.aclose()
+
+
+http_pool = HTTPClientPool()
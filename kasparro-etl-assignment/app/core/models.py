@@ -1,8 +1,15 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text, Index
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Float, DateTime, JSON, Text, Index, ForeignKey, PrimaryKeyConstraint, DDL, event,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.db import Base
 
+# Raw payloads are binary JSONB on PostgreSQL (parsed once on write) and plain JSON elsewhere
+RawPayload = JSON().with_variant(JSONB(), "postgresql")
+
 
 class RawCoinPaprika(Base):
     """Raw data from CoinPaprika API."""
@@ -10,11 +17,20 @@ class RawCoinPaprika(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     source_name = Column(String, default="coinpaprika", nullable=False)
-    payload = Column(JSON, nullable=False)
+    payload = Column(RawPayload, nullable=False)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the canonical JSON payload
+    # Hot keys extracted from the payload on write, so lookups never parse payloads
+    source_record_id = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)
+    source_timestamp = Column(DateTime(timezone=True), nullable=True)
     fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     __table_args__ = (
         Index('idx_coinpaprika_fetched', 'fetched_at'),
+        Index('idx_coinpaprika_content_hash', 'content_hash'),
+        Index('idx_coinpaprika_record_fetched', 'source_record_id', 'fetched_at'),
+        Index('idx_coinpaprika_symbol_fetched', 'symbol', 'fetched_at'),
+        Index('idx_coinpaprika_source_timestamp', 'source_timestamp'),
     )
 
 
@@ -24,11 +40,20 @@ class RawCoinGecko(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     source_name = Column(String, default="coingecko", nullable=False)
-    payload = Column(JSON, nullable=False)
+    payload = Column(RawPayload, nullable=False)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the canonical JSON payload
+    # Hot keys extracted from the payload on write, so lookups never parse payloads
+    source_record_id = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)
+    source_timestamp = Column(DateTime(timezone=True), nullable=True)
     fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     __table_args__ = (
         Index('idx_coingecko_fetched', 'fetched_at'),
+        Index('idx_coingecko_content_hash', 'content_hash'),
+        Index('idx_coingecko_record_fetched', 'source_record_id', 'fetched_at'),
+        Index('idx_coingecko_symbol_fetched', 'symbol', 'fetched_at'),
+        Index('idx_coingecko_source_timestamp', 'source_timestamp'),
     )
 
 
@@ -38,14 +63,34 @@ class RawCSVSource(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     source_name = Column(String, default="csv_source", nullable=False)
-    payload = Column(JSON, nullable=False)
+    payload = Column(RawPayload, nullable=False)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the canonical JSON payload
+    # Hot keys extracted from the payload on write, so lookups never parse payloads
+    source_record_id = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)
+    source_timestamp = Column(DateTime(timezone=True), nullable=True)
     fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     __table_args__ = (
         Index('idx_csv_fetched', 'fetched_at'),
+        Index('idx_csv_content_hash', 'content_hash'),
+        Index('idx_csv_record_fetched', 'source_record_id', 'fetched_at'),
+        Index('idx_csv_symbol_fetched', 'symbol', 'fetched_at'),
+        Index('idx_csv_source_timestamp', 'source_timestamp'),
     )
 
 
+class RawRecordHash(Base):
+    """Latest raw payload hash per source record, used to skip unchanged payloads."""
+    __tablename__ = "raw_record_hashes"
+    
+    source = Column(String, primary_key=True)
+    record_key = Column(String, primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    raw_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
 class Asset(Base):
     """Unified asset table with normalized data."""
     __tablename__ = "assets"
@@ -55,15 +100,176 @@ class Asset(Base):
     name = Column(String, nullable=False)
     price_usd = Column(Float, nullable=True)
     market_cap = Column(Float, nullable=True)
+    volume_24h = Column(Float, nullable=True)
     source = Column(String, nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     __table_args__ = (
         Index('idx_assets_symbol_source', 'symbol', 'source', unique=True),
-        Index('idx_assets_updated', 'updated_at'),
+        # Matches the /data sort order (updated_at DESC, asset_id DESC) for keyset pagination
+        Index('idx_assets_updated_id', 'updated_at', 'asset_id'),
     )
 
 
+# Symbol search indexes (PostgreSQL): trigram GIN for substring matches and a
+# text_pattern_ops btree so prefix LIKE can use an index under any collation
+event.listen(
+    Asset.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Asset.__table__,
+    "after_create",
+    DDL("CREATE INDEX IF NOT EXISTS idx_assets_symbol_trgm ON assets USING gin (symbol gin_trgm_ops)").execute_if(
+        dialect="postgresql"
+    ),
+)
+event.listen(
+    Asset.__table__,
+    "after_create",
+    DDL("CREATE INDEX IF NOT EXISTS idx_assets_symbol_pattern ON assets (symbol text_pattern_ops)").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+class Coin(Base):
+    """Canonical coin shared by every source that lists it."""
+    __tablename__ = "coins"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String, nullable=False, unique=True, index=True)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class SymbolAlias(Base):
+    """Alternative spelling of a coin symbol and the canonical symbol it resolves to."""
+    __tablename__ = "symbol_aliases"
+    
+    alias = Column(String, primary_key=True)
+    canonical = Column(String, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class CoinSourceMapping(Base):
+    """Links a source-specific coin ID to its canonical coin."""
+    __tablename__ = "coin_source_mappings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    coin_id = Column(Integer, ForeignKey("coins.id"), nullable=False, index=True)
+    source = Column(String, nullable=False)
+    source_id = Column(String, nullable=False)
+    source_symbol = Column(String, nullable=True)
+    source_name = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_seen = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    coin = relationship("Coin")
+    
+    __table_args__ = (
+        Index('idx_coin_mappings_source_id', 'source', 'source_id', unique=True),
+    )
+
+
+class AssetPrice(Base):
+    """Price observation for a canonical coin from one source."""
+    __tablename__ = "asset_prices"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), autoincrement=True)
+    coin_id = Column(Integer, ForeignKey("coins.id"), nullable=False)
+    price_usd = Column(Float, nullable=False)
+    market_cap_usd = Column(Float, nullable=True)
+    volume_24h_usd = Column(Float, nullable=True)
+    percent_change_24h = Column(Float, nullable=True)
+    source = Column(String, nullable=False)
+    source_timestamp = Column(DateTime(timezone=True), nullable=True)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # The mapped identity is id on every backend. PostgreSQL keeps price history
+    # range-partitioned by fetched_at (see app.services.partitions), where the
+    # partition key must be part of the primary key: there the constraint is
+    # (id, fetched_at), added after CREATE TABLE below, as in migration 006.
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='asset_prices_pkey').ddl_if(
+            callable_=lambda ddl, target, bind, dialect=None, **kw: dialect.name != "postgresql"
+        ),
+        Index('idx_asset_prices_coin_fetched', 'coin_id', 'fetched_at'),
+        {'postgresql_partition_by': 'RANGE (fetched_at)'},
+    )
+
+
+event.listen(
+    AssetPrice.__table__,
+    "after_create",
+    DDL("ALTER TABLE asset_prices ADD CONSTRAINT asset_prices_pkey PRIMARY KEY (id, fetched_at)").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+# Catch-all partition so inserts never fail before time partitions exist
+event.listen(
+    AssetPrice.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS asset_prices_default PARTITION OF asset_prices DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+class LatestPrice(Base):
+    """Current price per coin and source, maintained alongside asset_prices."""
+    __tablename__ = "latest_prices"
+    
+    coin_id = Column(Integer, ForeignKey("coins.id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    price_usd = Column(Float, nullable=False)
+    market_cap_usd = Column(Float, nullable=True)
+    volume_24h_usd = Column(Float, nullable=True)
+    percent_change_24h = Column(Float, nullable=True)
+    source_timestamp = Column(DateTime(timezone=True), nullable=True)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class PriceCandle(Base):
+    """
+    OHLC rollup of price history per coin, source and bucket, maintained
+    incrementally as prices are written (see app.services.candles).
+    """
+    __tablename__ = "price_candles"
+    
+    coin_id = Column(Integer, ForeignKey("coins.id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    resolution = Column(String(2), primary_key=True)  # "1m", "1h" or "1d"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    open_usd = Column(Float, nullable=False)
+    high_usd = Column(Float, nullable=False)
+    low_usd = Column(Float, nullable=False)
+    close_usd = Column(Float, nullable=False)
+    volume_24h_usd = Column(Float, nullable=True)  # Rolling 24h volume as of the close
+    tick_count = Column(Integer, nullable=False)
+    open_at = Column(DateTime(timezone=True), nullable=False)  # fetched_at of the open tick
+    close_at = Column(DateTime(timezone=True), nullable=False)  # fetched_at of the close tick
+
+
+class ConsensusPrice(Base):
+    """Cross-source consensus price per symbol, recomputed after each ETL run."""
+    __tablename__ = "consensus_prices"
+    
+    symbol = Column(String, primary_key=True)
+    median_price_usd = Column(Float, nullable=False)
+    vwap_price_usd = Column(Float, nullable=False)  # Volume-weighted; median when no source reports volume
+    min_price_usd = Column(Float, nullable=False)
+    max_price_usd = Column(Float, nullable=False)
+    spread_pct = Column(Float, nullable=False)  # (max - min) / median * 100
+    source_count = Column(Integer, nullable=False)
+    total_volume_24h = Column(Float, nullable=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+
 class ETLCheckpoint(Base):
     """ETL checkpoint table for incremental ingestion and recovery."""
     __tablename__ = "etl_checkpoints"
@@ -72,6 +278,11 @@ class ETLCheckpoint(Base):
     source = Column(String, nullable=False, unique=True, index=True)
     last_processed_id = Column(Integer, nullable=True)
     last_processed_at = Column(DateTime(timezone=True), nullable=True)
+    # Resume position for file sources: byte offset just past the last processed row
+    last_byte_offset = Column(BigInteger, nullable=True)
+    last_row_number = Column(Integer, nullable=True)
+    # Identity of the file the offset belongs to (inode, prefix length, prefix hash)
+    last_file_fingerprint = Column(String, nullable=True)
     status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
     run_id = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,22 +1,111 @@
 """Base class for data ingestion sources."""
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+import httpx
+from sqlalchemy import func, insert, or_
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.db import get_upsert_insert
+from app.core.http import ValidatorCache, http_pool
 from app.core.logging import logger
 
 
+def chunked(records: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split a list of records into consecutive batches of at most `size` records."""
+    for i in range(0, len(records), size):
+        yield records[i:i + size]
+
+
+def content_hash(payload: Any) -> str:
+    """sha256 of the payload's canonical JSON form (sorted keys, compact separators)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def parse_source_timestamp(value: Any) -> Optional[datetime]:
+    """Source-reported time as an aware UTC datetime: ISO 8601 strings or epoch seconds, else None."""
+    if isinstance(value, bool) or value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, tz=timezone.utc)
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
 class IngestionSource(ABC):
     """Abstract base class for all ingestion sources."""
     
+    # Raw table model for this source; set by subclasses
+    raw_model = None
+    
     def __init__(self, source_name: str, db: Session):
         self.source_name = source_name
         self.db = db
+        # Per-run counters (e.g. "failed"), reset by the ETL runner
+        self.stats: Counter = Counter()
+        # Resume position after the last yielded batch (file sources only)
+        self.position: Optional[Tuple[int, int, Optional[str]]] = None
+        # ETag/Last-Modified seen this run, stored only once the run completes
+        self.pending_validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    
+    def reset_run_state(self):
+        """Clear per-run state before the ETL runner starts a new run."""
+        self.stats.clear()
+        self.position = None
+        self.pending_validators.clear()
+    
+    def finalize_run(self):
+        """
+        Commit deferred per-run state after a successful run. Validators are only
+        remembered here so a failed run is never skipped by a later 304.
+        """
+        for key, validators in self.pending_validators.items():
+            http_pool.validators.store(key, validators)
+        self.pending_validators.clear()
+    
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously fetched resource."""
+        return http_pool.validators.conditional_headers(key)
+    
+    def is_not_modified(self, key: str, response: httpx.Response) -> bool:
+        """Track validators of a response; True if the server answered 304 Not Modified."""
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            logger.info(f"{self.source_name}: {key} not modified since last fetch")
+            return True
+        validators = ValidatorCache.extract(response)
+        if validators:
+            self.pending_validators[key] = validators
+        return False
     
     @abstractmethod
     def fetch_data(self, last_processed_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Fetch raw data from the source."""
         pass
     
+    def iter_batches(
+        self,
+        last_processed_id: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        position: Optional[Tuple[int, int, Optional[str]]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield raw records in batches for the ETL runner.
+        
+        The default fetches everything and slices it; sources that can stream
+        (paginated APIs, files) override this to yield batches as data arrives.
+        File sources resume from `position` and update self.position before
+        yielding each batch.
+        """
+        yield from chunked(self.fetch_data(last_processed_id), batch_size or settings.ETL_BATCH_SIZE)
+    
     @abstractmethod
     def normalize(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Normalize raw data to unified asset format."""
@@ -24,25 +113,306 @@ class IngestionSource(ABC):
     
     def save_raw(self, payload: Dict[str, Any]) -> int:
         """Save raw data to the appropriate raw table. Returns the inserted ID."""
-        raise NotImplementedError("Subclasses must implement save_raw")
+        return self.save_raw_batch([payload])[0]
+    
+    def save_raw_batch(
+        self, payloads: List[Dict[str, Any]], content_hashes: Optional[List[str]] = None
+    ) -> List[int]:
+        """
+        Save a batch of raw records with a single multi-row INSERT ... RETURNING.
+        Returns the inserted IDs in the same order as the payloads.
+        """
+        if self.raw_model is None:
+            raise NotImplementedError("Subclasses must set raw_model")
+        if not payloads:
+            return []
+        if content_hashes is None:
+            content_hashes = [content_hash(payload) for payload in payloads]
+        
+        fetched_at = datetime.utcnow()
+        rows = [
+            {
+                "source_name": self.source_name,
+                "payload": payload,
+                "content_hash": digest,
+                **self.raw_key_columns(payload),
+                "fetched_at": fetched_at,
+            }
+            for payload, digest in zip(payloads, content_hashes)
+        ]
+        stmt = insert(self.raw_model).returning(
+            self.raw_model.id, sort_by_parameter_order=True
+        )
+        ids = self.db.execute(stmt, rows).scalars().all()
+        self.db.commit()
+        return list(ids)
+    
+    def record_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        """Stable identity of a raw record within this source (None disables dedupe for it)."""
+        key = payload.get("id") if isinstance(payload, dict) else None
+        return str(key) if key is not None else None
+    
+    def raw_key_columns(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Values for the indexed raw columns (source_record_id, symbol, source_timestamp)."""
+        if not isinstance(payload, dict):
+            return {"source_record_id": None, "symbol": None, "source_timestamp": None}
+        symbol = payload.get("symbol")
+        return {
+            "source_record_id": self.record_key(payload),
+            "symbol": str(symbol).upper() if symbol else None,
+            "source_timestamp": parse_source_timestamp(payload.get("last_updated")),
+        }
+    
+    def find_raw(
+        self,
+        symbol: Optional[str] = None,
+        source_record_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Raw rows of this source for one symbol and/or source record in
+        [since, until) by fetched_at, newest first. Served from the extracted
+        column indexes; payloads are only read for the rows returned.
+        """
+        if self.raw_model is None:
+            raise NotImplementedError("Subclasses must set raw_model")
+        model = self.raw_model
+        query = self.db.query(model)
+        if symbol is not None:
+            query = query.filter(model.symbol == symbol.upper())
+        if source_record_id is not None:
+            query = query.filter(model.source_record_id == source_record_id)
+        if since is not None:
+            query = query.filter(model.fetched_at >= since)
+        if until is not None:
+            query = query.filter(model.fetched_at < until)
+        query = query.order_by(model.fetched_at.desc(), model.id.desc())
+        return query.limit(limit).all() if limit else query.all()
+    
+    def filter_unchanged(self, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Drop records whose payload hash equals the latest hash stored for the same
+        record key (or an earlier record in this batch), counting them as
+        "skipped_unchanged". Returns the remaining records and their hashes.
+        """
+        from app.core.models import RawRecordHash
+        
+        hashes = [content_hash(record) for record in batch]
+        if not settings.ETL_SKIP_UNCHANGED:
+            return batch, hashes
+        
+        keys = [self.record_key(record) for record in batch]
+        lookup = {key for key in keys if key is not None}
+        known: Dict[str, str] = {}
+        if lookup:
+            known = dict(
+                self.db.query(RawRecordHash.record_key, RawRecordHash.content_hash).filter(
+                    RawRecordHash.source == self.source_name,
+                    RawRecordHash.record_key.in_(lookup),
+                ).all()
+            )
+        
+        fresh, fresh_hashes = [], []
+        for record, key, digest in zip(batch, keys, hashes):
+            if key is not None:
+                if known.get(key) == digest:
+                    self.stats["skipped_unchanged"] += 1
+                    continue
+                known[key] = digest
+            fresh.append(record)
+            fresh_hashes.append(digest)
+        return fresh, fresh_hashes
     
-    def process_batch(self, batch: List[Dict[str, Any]]) -> int:
-        """Process a batch of raw data records."""
-        processed = 0
+    def remember_hashes(self, batch: List[Dict[str, Any]], hashes: List[str], raw_ids: List[int]):
+        """Store the latest payload hash per record key once its batch has been processed."""
+        from app.core.models import RawRecordHash
+        
+        rows = {}
+        for record, digest, raw_id in zip(batch, hashes, raw_ids):
+            key = self.record_key(record)
+            if key is not None:
+                rows[key] = {"source": self.source_name, "record_key": key, "content_hash": digest, "raw_id": raw_id}
+        if not rows:
+            return
+        
+        upsert_insert = get_upsert_insert(self.db)
+        if upsert_insert is not None:
+            stmt = upsert_insert(RawRecordHash).values(list(rows.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RawRecordHash.source, RawRecordHash.record_key],
+                set_={
+                    "content_hash": stmt.excluded.content_hash,
+                    "raw_id": stmt.excluded.raw_id,
+                    "updated_at": func.now(),
+                },
+            )
+            self.db.execute(stmt)
+        else:
+            for row in rows.values():
+                self.db.merge(RawRecordHash(**row))
+        self.db.commit()
+    
+    def normalize_batch(self, batch: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Normalize a batch of raw records, returning one result (or None) per record.
+        Sources that can convert whole columns at once override this.
+        """
+        results = []
         for record in batch:
             try:
-                normalized = self.normalize(record)
-                if normalized:
-                    self.save_unified(normalized)
-                    processed += 1
-                else:
-                    logger.warning(f"Failed to normalize record from {self.source_name}: {record.get('id', 'unknown')}")
+                results.append(self.normalize(record))
             except Exception as e:
                 logger.error(f"Error processing record from {self.source_name}: {e}", exc_info=True)
-        return processed
+                results.append(None)
+        return results
+    
+    def process_batch(self, batch: List[Dict[str, Any]]) -> List[int]:
+        """
+        Process a batch of raw data records. Returns the positions in `batch` of
+        the records actually saved; records that failed normalization or saving
+        are left out, so the runner never remembers their hashes.
+        """
+        normalized_batch, normalized_records, positions = [], [], []
+        for position, (record, normalized) in enumerate(zip(batch, self.normalize_batch(batch))):
+            if normalized:
+                normalized_batch.append(normalized)
+                normalized_records.append(record)
+                positions.append(position)
+            else:
+                self.stats["failed"] += 1
+                record_id = record.get('id', 'unknown') if isinstance(record, dict) else 'unknown'
+                logger.warning(f"Failed to normalize record from {self.source_name}: {record_id}")
+        prices = None
+        if settings.ETL_PRICE_HISTORY_ENABLED:
+            prices = self.price_points(normalized_records, normalized_batch)
+        return [positions[i] for i in self.save_unified_rows(normalized_batch, prices)]
     
-    def save_unified(self, asset_data: Dict[str, Any]):
-        """Save normalized data to unified assets table."""
+    def price_points(
+        self, records: List[Dict[str, Any]], normalized_batch: List[Dict[str, Any]]
+    ) -> List[Optional[Any]]:
+        """
+        Price history points for a batch of normalized records, aligned with it
+        (None where a record has no price or no source id). The canonical coins
+        of the whole batch are resolved with one resolve_batch call.
+        """
+        from app.services.normalization import CoinNormalizationService, CoinRef, PricePoint
+        
+        refs: Dict[int, CoinRef] = {}
+        for i, (record, normalized) in enumerate(zip(records, normalized_batch)):
+            source_id = self.record_key(record)
+            if normalized.get('price_usd') is None or not normalized.get('symbol') or source_id is None:
+                continue
+            refs[i] = CoinRef(
+                source=self.source_name,
+                source_id=source_id,
+                symbol=normalized['symbol'],
+                name=normalized.get('name') or normalized['symbol'],
+            )
+        
+        points: List[Optional[Any]] = [None] * len(normalized_batch)
+        if not refs:
+            return points
+        coin_ids = CoinNormalizationService.resolve_batch(self.db, refs.values())
+        for i, ref in refs.items():
+            normalized = normalized_batch[i]
+            points[i] = PricePoint(
+                coin_id=coin_ids[(ref.source, ref.source_id)],
+                source=self.source_name,
+                price_usd=normalized['price_usd'],
+                market_cap_usd=normalized.get('market_cap'),
+                volume_24h_usd=normalized.get('volume_24h'),
+                source_timestamp=self.raw_key_columns(records[i])['source_timestamp'],
+            )
+        return points
+    
+    def save_unified_batch(self, batch: List[Dict[str, Any]], prices: Optional[List[Optional[Any]]] = None) -> int:
+        """Save a batch of normalized records (see save_unified_rows). Returns the number of records processed."""
+        return len(self.save_unified_rows(batch, prices))
+    
+    def save_unified_rows(self, batch: List[Dict[str, Any]], prices: Optional[List[Optional[Any]]] = None) -> List[int]:
+        """
+        Upsert a batch of normalized records into the unified assets table with a
+        single INSERT ... ON CONFLICT on (symbol, source).
+        
+        Existing rows are only updated when name, price, market cap or volume actually
+        differ, so unchanged assets keep their updated_at and index entries.
+        Changed vs unchanged rows are counted in stats. `prices` (aligned with
+        `batch`, see price_points) are appended to the price history, latest
+        prices and candles in the same transaction as the assets. Falls back to
+        per-record save_unified (isolating and counting failures) when the
+        dialect has no upsert support or the bulk statement fails. Returns the
+        positions in `batch` of the records written.
+        """
+        from app.core.models import Asset
+        from app.services.normalization import CoinNormalizationService
+        
+        if not batch:
+            return []
+        prices = prices or [None] * len(batch)
+        
+        upsert_insert = get_upsert_insert(self.db)
+        if upsert_insert is not None:
+            # ON CONFLICT cannot touch the same row twice in one statement: last record wins.
+            # Every row carries volume_24h so multi-row VALUES get a uniform column set.
+            rows = list({
+                (row['symbol'], row['source']): {**row, 'volume_24h': row.get('volume_24h')}
+                for row in batch
+            }.values())
+            stmt = upsert_insert(Asset).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Asset.symbol, Asset.source],
+                set_={
+                    "name": stmt.excluded.name,
+                    "price_usd": stmt.excluded.price_usd,
+                    "market_cap": stmt.excluded.market_cap,
+                    "volume_24h": stmt.excluded.volume_24h,
+                    "updated_at": func.now(),
+                },
+                where=or_(
+                    Asset.name.is_distinct_from(stmt.excluded.name),
+                    Asset.price_usd.is_distinct_from(stmt.excluded.price_usd),
+                    Asset.market_cap.is_distinct_from(stmt.excluded.market_cap),
+                    Asset.volume_24h.is_distinct_from(stmt.excluded.volume_24h),
+                ),
+            ).returning(Asset.asset_id)
+            try:
+                # Only inserted or actually updated rows come back from RETURNING
+                changed = len(self.db.execute(stmt).all())
+                points = [point for point in prices if point is not None]
+                if points:
+                    CoinNormalizationService.add_price_data_bulk(self.db, points, commit=False)
+                self.db.commit()
+                self.stats["unified_changed"] += changed
+                self.stats["unified_unchanged"] += len(rows) - changed
+                return list(range(len(batch)))
+            except Exception as e:
+                self.db.rollback()
+                logger.warning(f"Bulk upsert failed for {self.source_name}, retrying per record: {e}")
+        
+        written = []
+        for position, (asset_data, point) in enumerate(zip(batch, prices)):
+            try:
+                changed = self.save_unified(asset_data, commit=False)
+                if point is not None:
+                    CoinNormalizationService.add_price_data_bulk(self.db, [point], commit=False)
+                self.db.commit()
+                self.stats["unified_changed" if changed else "unified_unchanged"] += 1
+                written.append(position)
+            except Exception as e:
+                self.db.rollback()
+                self.stats["failed"] += 1
+                logger.error(f"Error saving record from {self.source_name}: {e}", exc_info=True)
+        return written
+    
+    def save_unified(self, asset_data: Dict[str, Any], commit: bool = True) -> bool:
+        """
+        Save normalized data to unified assets table.
+        Returns False (and writes nothing) when the stored row already matches.
+        With commit=False the change is only flushed, for callers that commit
+        it together with other writes.
+        """
         from app.core.models import Asset
         
         # Use upsert logic: update if exists, insert if not
@@ -52,12 +422,22 @@ class IngestionSource(ABC):
         ).first()
         
         if existing:
-            existing.name = asset_data['name']
-            existing.price_usd = asset_data.get('price_usd')
-            existing.market_cap = asset_data.get('market_cap')
+            values = {
+                "name": asset_data['name'],
+                "price_usd": asset_data.get('price_usd'),
+                "market_cap": asset_data.get('market_cap'),
+                "volume_24h": asset_data.get('volume_24h'),
+            }
+            if all(getattr(existing, field) == value for field, value in values.items()):
+                return False
+            for field, value in values.items():
+                setattr(existing, field, value)
         else:
             new_asset = Asset(**asset_data)
             self.db.add(new_asset)
         
-        self.db.commit()
-
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+        return True
@@ -1,9 +1,10 @@
 """CoinGecko API ingestion source."""
 import httpx
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.ingestion.base import IngestionSource
+from app.core.http import RateLimiter, http_pool, retry_after_seconds
+from app.ingestion.base import IngestionSource, chunked
 from app.core.models import RawCoinGecko
 from app.core.logging import logger
 from app.core.config import settings
@@ -12,36 +13,117 @@ from app.core.config import settings
 class CoinGeckoSource(IngestionSource):
     """Ingestion source for CoinGecko API."""
     
+    raw_model = RawCoinGecko
+    
     BASE_URL = "https://api.coingecko.com/api/v3"
     
-    def __init__(self, db: Session):
+    # Shared by every instance so concurrent runs stay within the API quota
+    rate_limiter = RateLimiter(
+        settings.COINGECKO_RATE_LIMIT_PER_MINUTE,
+        burst=settings.COINGECKO_MAX_CONCURRENCY,
+    )
+    
+    def __init__(self, db: Session, http_client: Optional[httpx.Client] = None):
         super().__init__("coingecko", db)
         self.api_key = settings.COINGECKO_API_KEY
+        self.http_client = http_client or http_pool.sync_client
+        self.pages = max(1, settings.COINGECKO_PAGES)
+        self.per_page = settings.COINGECKO_PER_PAGE
+        self.max_concurrency = max(1, settings.COINGECKO_MAX_CONCURRENCY)
     
     def fetch_data(self, last_processed_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Fetch market data from CoinGecko."""
+        """Fetch market data from CoinGecko (all configured pages)."""
         try:
-            url = f"{self.BASE_URL}/coins/markets"
-            params = {
-                "vs_currency": "usd",
-                "order": "market_cap_desc",
-                "per_page": 250,
-                "page": 1,
-            }
-            headers = {}
-            if self.api_key:
-                headers["x-cg-demo-api-key"] = self.api_key
-            
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(url, params=params, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                
-                return data if isinstance(data, list) else []
+            return [record for page in self.iter_pages() for record in page]
         except Exception as e:
             logger.error(f"Error fetching from CoinGecko: {e}", exc_info=True)
             return []
     
+    def iter_batches(
+        self,
+        last_processed_id: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        position: Optional[Tuple[int, int, Optional[str]]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Stream each page into the batch pipeline as soon as it arrives."""
+        batch_size = batch_size or settings.ETL_BATCH_SIZE
+        for page in self.iter_pages():
+            yield from chunked(page, batch_size)
+    
+    def iter_pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Fetch pages 1..COINGECKO_PAGES concurrently under the shared rate limiter,
+        yielding each page in completion order.
+        
+        A failed page never ends the run as completed: the remaining pages are
+        still fetched and yielded, failures are counted in stats["failed_pages"],
+        and the first error is raised once every page has finished, so the run
+        is marked failed and its validators are not remembered.
+        """
+        if self.pages == 1:
+            yield self._fetch_page(1)
+            return
+        
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, self.pages),
+            thread_name_prefix="coingecko",
+        )
+        futures = {executor.submit(self._fetch_page, page): page for page in range(1, self.pages + 1)}
+        first_error = None
+        try:
+            for future in as_completed(futures):
+                try:
+                    records = future.result()
+                except Exception as e:
+                    self.stats["failed_pages"] += 1
+                    first_error = first_error or e
+                    logger.error(f"Error fetching CoinGecko page {futures[future]}: {e}")
+                    continue
+                if records:
+                    yield records
+            if first_error is not None:
+                raise RuntimeError(
+                    f"{self.stats['failed_pages']} of {self.pages} CoinGecko pages failed"
+                ) from first_error
+        finally:
+            # Consumer stopped early (or failed): don't start pages nobody will read
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _fetch_page(self, page: int) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of /coins/markets, backing off on HTTP 429. A page answered
+        with 304 Not Modified yields no records.
+        """
+        url = f"{self.BASE_URL}/coins/markets"
+        params = {
+            "vs_currency": "usd",
+            "order": "market_cap_desc",
+            "per_page": self.per_page,
+            "page": page,
+        }
+        headers = {}
+        if self.api_key:
+            headers["x-cg-demo-api-key"] = self.api_key
+        validator_key = f"{url}?page={page}&per_page={self.per_page}"
+        headers.update(self.conditional_headers(validator_key))
+        
+        max_retries = settings.COINGECKO_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            self.rate_limiter.acquire()
+            response = self.http_client.get(url, params=params, headers=headers)
+            if response.status_code == 429 and attempt < max_retries:
+                # Pause every worker, not just this one: the quota is shared
+                self.rate_limiter.pause(retry_after_seconds(response, default=2 ** attempt))
+                continue
+            if self.is_not_modified(validator_key, response):
+                return []
+            response.raise_for_status()
+            data = response.json()
+            return data if isinstance(data, list) else []
+        return []
+    
     def normalize(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Normalize CoinGecko data to unified format."""
         try:
@@ -50,21 +132,9 @@ class CoinGeckoSource(IngestionSource):
                 "name": raw_data.get("name", ""),
                 "price_usd": raw_data.get("current_price"),
                 "market_cap": raw_data.get("market_cap"),
+                "volume_24h": raw_data.get("total_volume"),
                 "source": self.source_name,
             }
         except Exception as e:
             logger.error(f"Error normalizing CoinGecko data: {e}", exc_info=True)
             return None
-    
-    def save_raw(self, payload: Dict[str, Any]) -> int:
-        """Save raw CoinGecko data."""
-        raw_record = RawCoinGecko(
-            source_name=self.source_name,
-            payload=payload,
-            fetched_at=datetime.utcnow()
-        )
-        self.db.add(raw_record)
-        self.db.commit()
-        self.db.refresh(raw_record)
-        return raw_record.id
-
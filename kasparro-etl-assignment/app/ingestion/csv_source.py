@@ -1,18 +1,121 @@
 """CSV file ingestion source."""
 import csv
+import hashlib
 import os
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import BinaryIO, Iterator, List, Dict, Any, NamedTuple, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
-from datetime import datetime
 from app.ingestion.base import IngestionSource
 from app.core.models import RawCSVSource
 from app.core.logging import logger
 from app.core.config import settings
 
 
+# Accepted spellings per unified field, in priority order
+SYMBOL_COLUMNS = ("symbol", "Symbol", "SYMBOL")
+NAME_COLUMNS = ("name", "Name", "NAME")
+PRICE_COLUMNS = ("price", "Price", "PRICE", "price_usd", "priceUSD")
+MARKET_CAP_COLUMNS = ("market_cap", "MarketCap", "MARKET_CAP", "marketCap")
+VOLUME_COLUMNS = ("volume_24h", "Volume24h", "VOLUME_24H", "volume", "Volume")
+
+# Leading bytes hashed to recognise the file a checkpoint offset was taken from
+FINGERPRINT_BYTES = 4096
+
+
+class CSVColumnMap(NamedTuple):
+    """Header columns backing each unified field, resolved once per header."""
+    symbol: Tuple[str, ...]
+    name: Tuple[str, ...]
+    price: Tuple[str, ...]
+    market_cap: Tuple[str, ...]
+    volume: Tuple[str, ...]
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def from_header(header: Tuple[str, ...]) -> "CSVColumnMap":
+        present = set(header)
+        return CSVColumnMap(
+            symbol=tuple(c for c in SYMBOL_COLUMNS if c in present),
+            name=tuple(c for c in NAME_COLUMNS if c in present),
+            price=tuple(c for c in PRICE_COLUMNS if c in present),
+            market_cap=tuple(c for c in MARKET_CAP_COLUMNS if c in present),
+            volume=tuple(c for c in VOLUME_COLUMNS if c in present),
+        )
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_float_column(values: Sequence[Any]) -> List[Optional[float]]:
+    """
+    Convert a column of CSV cells to floats; empty or malformed cells become None.
+    
+    A clean column converts in one tight pass. Only a chunk containing a bad
+    cell is re-parsed cell by cell, so malformed values never abort the chunk.
+    """
+    try:
+        return [float(v) if v else None for v in values]
+    except (ValueError, TypeError):
+        return [_to_float(v) if v else None for v in values]
+
+
+def _column_values(batch: List[Dict[str, Any]], columns: Tuple[str, ...]) -> List[Any]:
+    """First truthy value among `columns` per row, as in the per-row `a or b or c` lookup."""
+    if not columns:
+        return [None] * len(batch)
+    if len(columns) == 1:
+        column = columns[0]
+        return [row.get(column) for row in batch]
+    return [next((row[c] for c in columns if row.get(c)), None) for row in batch]
+
+
+def _numeric_column(batch: List[Dict[str, Any]], columns: Tuple[str, ...]) -> List[Optional[float]]:
+    """First parseable number among `columns` per row; remaining gaps stay None."""
+    result: List[Optional[float]] = [None] * len(batch)
+    for i, column in enumerate(columns):
+        parsed = parse_float_column([row.get(column) for row in batch])
+        if i == 0:
+            result = parsed
+        else:
+            result = [current if current is not None else new for current, new in zip(result, parsed)]
+        if None not in result:
+            break
+    return result
+
+
+class _OffsetLineReader:
+    """
+    Line iterator over a binary file that tracks the byte offset of everything
+    handed out so far. csv.reader pulls lines lazily (including continuation
+    lines of quoted multi-line fields), so after each parsed row `offset` points
+    exactly past that row.
+    """
+    
+    def __init__(self, f: BinaryIO, offset: int, encoding: str = "utf-8"):
+        self.f = f
+        self.offset = offset
+        self.encoding = encoding
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding)
+
+
 class CSVSource(IngestionSource):
     """Ingestion source for CSV files."""
     
+    raw_model = RawCSVSource
+    
     def __init__(self, db: Session, csv_path: Optional[str] = None):
         super().__init__("csv_source", db)
         self.csv_path = csv_path or settings.CSV_SOURCE_PATH or "data/sample.csv"
@@ -20,71 +123,148 @@ class CSVSource(IngestionSource):
     def fetch_data(self, last_processed_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Read data from CSV file."""
         try:
-            if not os.path.exists(self.csv_path):
-                logger.warning(f"CSV file not found: {self.csv_path}")
-                return []
-            
-            records = []
-            with open(self.csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for idx, row in enumerate(reader, start=1):
-                    # Skip if we have a checkpoint and this is before it
-                    if last_processed_id is not None and idx <= last_processed_id:
-                        continue
-                    records.append(row)
-            
-            return records
+            return [row for batch in self.iter_batches(last_processed_id) for row in batch]
         except Exception as e:
             logger.error(f"Error reading CSV file: {e}", exc_info=True)
             return []
     
-    def normalize(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Normalize CSV data to unified format."""
-        try:
-            # CSV format may vary, try common field names
-            symbol = raw_data.get("symbol") or raw_data.get("Symbol") or raw_data.get("SYMBOL", "")
-            name = raw_data.get("name") or raw_data.get("Name") or raw_data.get("NAME", "")
+    def iter_batches(
+        self,
+        last_processed_id: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        position: Optional[Tuple[int, int, Optional[str]]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream the CSV in bounded batches, in constant memory.
+        
+        Resumes by seeking to `position` (byte offset, row number, file
+        fingerprint) from the checkpoint, unless the file has been replaced
+        since. Without a position, falls back to skipping the first
+        `last_processed_id` rows. self.position is updated before each yield.
+        """
+        batch_size = batch_size or settings.ETL_BATCH_SIZE
+        if not os.path.exists(self.csv_path):
+            logger.warning(f"CSV file not found: {self.csv_path}")
+            return
+        
+        with open(self.csv_path, 'rb') as f:
+            fingerprint = self._fingerprint(f)
+            header = next(csv.reader([f.readline().decode('utf-8-sig')]), None)
+            if not header:
+                return
+            offset, row_number = f.tell(), 0
             
-            # Try to parse price and market cap
-            price_usd = None
-            market_cap = None
+            if position is not None:
+                saved_offset, saved_row, saved_fingerprint = position
+                if not self._same_file(f, saved_fingerprint):
+                    logger.warning(f"{self.csv_path} was replaced since the checkpoint; reading from the start")
+                elif self._is_row_boundary(f, saved_offset, offset):
+                    offset, row_number = saved_offset, saved_row
+                    fingerprint = saved_fingerprint
+                else:
+                    logger.warning(
+                        f"Checkpoint offset {saved_offset} is not a row boundary in {self.csv_path}; "
+                        f"reading from the start"
+                    )
+            f.seek(offset)
             
-            for price_key in ["price", "Price", "PRICE", "price_usd", "priceUSD"]:
-                if price_key in raw_data:
-                    try:
-                        price_usd = float(raw_data[price_key])
-                        break
-                    except (ValueError, TypeError):
-                        continue
+            lines = _OffsetLineReader(f, offset)
+            reader = csv.DictReader(lines, fieldnames=header)
+            skip_rows = last_processed_id if position is None and last_processed_id else 0
             
-            for cap_key in ["market_cap", "MarketCap", "MARKET_CAP", "marketCap"]:
-                if cap_key in raw_data:
-                    try:
-                        market_cap = float(raw_data[cap_key])
-                        break
-                    except (ValueError, TypeError):
-                        continue
+            batch = []
+            for row in reader:
+                row_number += 1
+                # Legacy checkpoints stored a row index instead of a byte offset
+                if row_number <= skip_rows:
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self.position = (lines.offset, row_number, fingerprint)
+                    yield batch
+                    batch = []
             
-            return {
-                "symbol": str(symbol).upper(),
-                "name": str(name),
-                "price_usd": price_usd,
-                "market_cap": market_cap,
-                "source": self.source_name,
-            }
-        except Exception as e:
-            logger.error(f"Error normalizing CSV data: {e}", exc_info=True)
-            return None
+            if batch:
+                self.position = (lines.offset, row_number, fingerprint)
+                yield batch
     
-    def save_raw(self, payload: Dict[str, Any]) -> int:
-        """Save raw CSV data."""
-        raw_record = RawCSVSource(
-            source_name=self.source_name,
-            payload=payload,
-            fetched_at=datetime.utcnow()
-        )
-        self.db.add(raw_record)
-        self.db.commit()
-        self.db.refresh(raw_record)
-        return raw_record.id
+    @staticmethod
+    def _is_row_boundary(f: BinaryIO, offset: int, data_start: int) -> bool:
+        """Check that a saved offset still lands on a line start inside the file."""
+        size = os.fstat(f.fileno()).st_size
+        if offset < data_start or offset > size:
+            return False
+        if offset == data_start:
+            return True
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+    
+    @staticmethod
+    def _fingerprint(f: BinaryIO, length: Optional[int] = None) -> str:
+        """Identify the open file by inode and a hash of its leading bytes; leaves f at the start."""
+        stat = os.fstat(f.fileno())
+        length = min(stat.st_size, FINGERPRINT_BYTES) if length is None else length
+        f.seek(0)
+        digest = hashlib.sha256(f.read(length)).hexdigest()
+        f.seek(0)
+        return f"{stat.st_ino}:{length}:{digest}"
+    
+    @classmethod
+    def _same_file(cls, f: BinaryIO, saved: Optional[str]) -> bool:
+        """Check a checkpoint fingerprint against the open file; appends keep the identity."""
+        try:
+            _, length, _ = (saved or "").split(":")
+            length = int(length)
+        except ValueError:
+            return False  # Checkpoints from before fingerprinting cannot be trusted
+        if length > os.fstat(f.fileno()).st_size:
+            return False
+        return cls._fingerprint(f, length) == saved
+    
+    def record_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        """CSV rows have no id column; a row is identified by its symbol."""
+        symbol = next((payload[c] for c in SYMBOL_COLUMNS if payload.get(c)), None)
+        return str(symbol).upper() if symbol else None
+    
+    def raw_key_columns(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """The symbol is both the record id and the symbol; CSV rows carry no timestamp."""
+        key = self.record_key(payload)
+        return {"source_record_id": key, "symbol": key, "source_timestamp": None}
 
+    def normalize(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Normalize CSV data to unified format."""
+        return self.normalize_batch([raw_data])[0]
+    
+    def normalize_batch(self, batch: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Normalize a chunk of CSV rows column by column.
+        
+        The column mapping is resolved once per header rather than probing every
+        spelling on every row, and numeric columns are converted per chunk.
+        """
+        if not batch:
+            return []
+        try:
+            columns = CSVColumnMap.from_header(tuple(k for k in batch[0].keys() if k is not None))
+            source = self.source_name
+            
+            return [
+                {
+                    "symbol": str(symbol or "").upper(),
+                    "name": str(name or ""),
+                    "price_usd": price_usd,
+                    "market_cap": market_cap,
+                    "volume_24h": volume_24h,
+                    "source": source,
+                }
+                for symbol, name, price_usd, market_cap, volume_24h in zip(
+                    _column_values(batch, columns.symbol),
+                    _column_values(batch, columns.name),
+                    _numeric_column(batch, columns.price),
+                    _numeric_column(batch, columns.market_cap),
+                    _numeric_column(batch, columns.volume),
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Error normalizing CSV data: {e}", exc_info=True)
+            return super().normalize_batch(batch) if len(batch) > 1 else [None]
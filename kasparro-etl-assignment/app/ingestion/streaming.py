@@ -0,0 +1,138 @@
+"""Incremental parsing and prefetching helpers for streaming ingestion."""
+import codecs
+import json
+import queue
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, List
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that can extend a JSON number ("456" -> "456.7e3")
+_NUMBER_TAIL = frozenset("0123456789.eE+-")
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Incrementally decode the elements of a top-level JSON array from byte chunks.
+
+    Each element is yielded as soon as its closing byte has arrived, so only the
+    unparsed tail of the download is held in memory. Raises ValueError if the
+    document is not a well-formed array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    started = False
+    expect_value = True  # after '[' or ',': a value (or ']' right after '[')
+    first = True
+
+    def parse(final: bool) -> Iterator[Any]:
+        nonlocal buf, started, expect_value, first
+        pos = 0
+        try:
+            while True:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos >= len(buf):
+                    return
+                char = buf[pos]
+                if not started:
+                    if char != "[":
+                        raise ValueError("Expected a JSON array")
+                    started = True
+                    pos += 1
+                elif char == "]" and (not expect_value or first):
+                    buf = None
+                    return
+                elif char == "," and not expect_value:
+                    expect_value = True
+                    pos += 1
+                elif expect_value:
+                    try:
+                        value, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if final:
+                            raise ValueError("Truncated or malformed JSON array element")
+                        return  # element not fully downloaded yet
+                    if not final and char not in '{["' and (end == len(buf) or buf[end] in _NUMBER_TAIL):
+                        return  # a bare number may continue in the next chunk
+                    pos = end
+                    expect_value = False
+                    first = False
+                    yield value
+                else:
+                    raise ValueError(f"Unexpected character {char!r} in JSON array")
+        finally:
+            if buf is not None:
+                buf = buf[pos:]
+
+    for chunk in chunks:
+        buf += text_decoder.decode(chunk)
+        yield from parse(final=False)
+        if buf is None:
+            return
+    buf += text_decoder.decode(b"", final=True)
+    yield from parse(final=True)
+    if buf is not None:
+        raise ValueError("JSON array was not terminated")
+
+
+def iter_json_batches(chunks: Iterable[bytes], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group streamed JSON array elements into fixed-size batches."""
+    batch = []
+    for item in iter_json_array(chunks):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_DONE = object()
+
+
+def prefetch(iterator: Iterator[Any], max_buffered: int) -> Iterator[Any]:
+    """
+    Run `iterator` in a background thread, keeping at most `max_buffered` items
+    queued ahead of the consumer. Lets network download overlap with batch
+    processing while bounding peak memory. Producer exceptions are re-raised in
+    the consumer; closing the consumer early stops the producer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, max_buffered))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
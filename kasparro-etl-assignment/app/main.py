@@ -1,13 +1,36 @@
 """FastAPI application entry point."""
 from fastapi import FastAPI
-from app.api import routes, health, stats
+from app.api import routes, health, stats, consensus, candles, symbols
 from app.core.logging import logger
 from app.core.db import Base, engine
 from contextlib import asynccontextmanager
 import asyncio
 from app.services.etl_runner import ETLRunner
 from app.core.db import SessionLocal
+from app.core.async_db import async_engine
 from app.core.config import settings
+from app.core.http import http_pool
+from app.services.identity_cache import coin_identity_cache
+from app.services.partitions import maintain_price_partitions
+from app.services.raw_archive import archive_raw_tables
+from app.services.symbol_resolver import symbol_resolver
+
+
+def run_etl_cycle(http_client):
+    """One blocking ETL cycle on its own session (run off the event loop)."""
+    db = SessionLocal()
+    try:
+        # Pick up alias table edits without a restart; roll partitions forward
+        # and move raw payloads past RAW_ARCHIVE_AFTER_DAYS to the disk archive
+        symbol_resolver.reload_if_changed(db)
+        maintain_price_partitions(db)
+        archive_raw_tables(db)
+        etl_runner = ETLRunner(db, http_client=http_client)
+        result = etl_runner.run_all()
+        logger.info(f"ETL run completed: {result}")
+        coin_identity_cache.flush_last_seen(db)
+    finally:
+        db.close()
 
 
 @asynccontextmanager
@@ -20,17 +43,28 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
     
-    # Start background ETL task
+    # Compile symbol aliases, warm the (source, source_id) -> coin cache and
+    # make sure price history partitions exist before the first ETL cycle
+    db = SessionLocal()
+    try:
+        maintain_price_partitions(db)
+        symbol_resolver.reload(db)
+        coin_identity_cache.warm(db)
+    except Exception as e:
+        logger.warning(f"Startup maintenance failed: {e}")
+    finally:
+        db.close()
+    
+    # Shared pooled HTTP clients for API sources (closed on shutdown)
+    app.state.http_pool = http_pool
+    http_client = http_pool.sync_client
+    
+    # Start background ETL task; each cycle runs in a worker thread so the
+    # blocking database and HTTP work never stalls requests on the event loop
     async def run_etl_periodically():
         while True:
             try:
-                db = SessionLocal()
-                try:
-                    etl_runner = ETLRunner(db)
-                    result = etl_runner.run_all()
-                    logger.info(f"ETL run completed: {result}")
-                finally:
-                    db.close()
+                await asyncio.to_thread(run_etl_cycle, http_client)
             except Exception as e:
                 logger.error(f"ETL run error: {e}", exc_info=True)
             
@@ -47,6 +81,15 @@ async def lifespan(app: FastAPI):
         await etl_task
     except asyncio.CancelledError:
         pass
+    await http_pool.aclose()
+    await async_engine.dispose()
+    db = SessionLocal()
+    try:
+        coin_identity_cache.flush_last_seen(db)
+    except Exception as e:
+        logger.warning(f"Could not flush coin last_seen updates: {e}")
+    finally:
+        db.close()
     logger.info("Application shutting down...")
 
 
@@ -61,6 +104,9 @@ app = FastAPI(
 app.include_router(routes.router, tags=["data"])
 app.include_router(health.router, tags=["health"])
 app.include_router(stats.router, tags=["stats"])
+app.include_router(consensus.router, tags=["consensus"])
+app.include_router(candles.router, tags=["candles"])
+app.include_router(symbols.router, tags=["symbols"])
 
 
 @app.get("/")
@@ -0,0 +1,29 @@
+"""Pydantic schemas for OHLC price candles."""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class CandleResponse(BaseModel):
+    """One OHLC bucket."""
+    bucket_start: datetime
+    open_usd: float
+    high_usd: float
+    low_usd: float
+    close_usd: float
+    volume_24h_usd: Optional[float] = None
+    tick_count: int
+    
+    model_config = {"from_attributes": True}
+
+
+class CandleListResponse(BaseModel):
+    """Schema for a candle series response."""
+    request_id: str
+    api_latency_ms: float
+    symbol: str
+    source: str
+    interval: str
+    start: datetime
+    end: datetime
+    data: list[CandleResponse]
@@ -0,0 +1,29 @@
+"""Pydantic schemas for cross-source consensus prices."""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ConsensusResponse(BaseModel):
+    """Consensus price for one symbol across all sources."""
+    symbol: str
+    median_price_usd: float
+    vwap_price_usd: float
+    min_price_usd: float
+    max_price_usd: float
+    spread_pct: float
+    source_count: int
+    total_volume_24h: Optional[float] = None
+    computed_at: datetime
+    
+    model_config = {"from_attributes": True}
+
+
+class ConsensusListResponse(BaseModel):
+    """Schema for paginated consensus price list response."""
+    request_id: str
+    api_latency_ms: float
+    data: list[ConsensusResponse]
+    total: int
+    page: int
+    page_size: int
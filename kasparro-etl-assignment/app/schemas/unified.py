@@ -10,6 +10,7 @@ class AssetBase(BaseModel):
     name: str
     price_usd: Optional[float] = None
     market_cap: Optional[float] = None
+    volume_24h: Optional[float] = None
     source: str
 
 
@@ -27,11 +28,29 @@ class AssetResponse(AssetBase):
 
 
 class AssetListResponse(BaseModel):
-    """Schema for paginated asset list response."""
+    """
+    Schema for paginated asset list response. In cursor mode page and total
+    are null; next_cursor is null on the last page in both modes.
+    """
     request_id: str
     api_latency_ms: float
     data: list[AssetResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
 
+
+
+class SymbolSuggestion(BaseModel):
+    """One autocomplete match."""
+    symbol: str
+    name: str
+
+
+class SymbolAutocompleteResponse(BaseModel):
+    """Schema for symbol autocomplete response."""
+    request_id: str
+    api_latency_ms: float
+    query: str
+    data: list[SymbolSuggestion]
@@ -0,0 +1,203 @@
+"""Incremental OHLC rollups (price_candles) of the asset_prices price history."""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.db import get_upsert_insert
+from app.core.logging import logger
+from app.core.models import AssetPrice, PriceCandle
+
+# Finest first: the API serves the finest resolution that fits the requested range
+RESOLUTIONS: Dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+CandleKey = Tuple[int, str, str, datetime]
+
+
+def as_naive_utc(moment: datetime) -> datetime:
+    """Aware datetimes converted to naive UTC, the form candle buckets and fetched_at are stored in."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    """Start of the bucket containing `moment`."""
+    if resolution == "1m":
+        return moment.replace(second=0, microsecond=0)
+    if resolution == "1h":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if resolution == "1d":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported candle resolution: {resolution}")
+
+
+def choose_resolution(start: datetime, end: datetime) -> str:
+    """Finest resolution covering [start, end) in at most CANDLE_MAX_POINTS buckets."""
+    for resolution, width in RESOLUTIONS.items():
+        if (end - start) / width <= settings.CANDLE_MAX_POINTS:
+            return resolution
+    return "1d"
+
+
+def aggregate_points(points: Iterable[Any]) -> Dict[CandleKey, Dict[str, Any]]:
+    """
+    Fold price points (PricePoint or AssetPrice) into one partial candle per
+    touched (coin, source, resolution, bucket). Open and close are the ticks
+    with the earliest and latest fetched_at, whatever order they arrive in.
+    """
+    candles: Dict[CandleKey, Dict[str, Any]] = {}
+    for point in points:
+        price, fetched_at = point.price_usd, point.fetched_at
+        if price is None or fetched_at is None:
+            continue
+        for resolution in RESOLUTIONS:
+            key = (point.coin_id, point.source, resolution, bucket_start(fetched_at, resolution))
+            candle = candles.get(key)
+            if candle is None:
+                candles[key] = {
+                    "coin_id": point.coin_id,
+                    "source": point.source,
+                    "resolution": resolution,
+                    "bucket_start": key[3],
+                    "open_usd": price,
+                    "high_usd": price,
+                    "low_usd": price,
+                    "close_usd": price,
+                    "volume_24h_usd": point.volume_24h_usd,
+                    "tick_count": 1,
+                    "open_at": fetched_at,
+                    "close_at": fetched_at,
+                }
+                continue
+            candle["high_usd"] = max(candle["high_usd"], price)
+            candle["low_usd"] = min(candle["low_usd"], price)
+            candle["tick_count"] += 1
+            if fetched_at < candle["open_at"]:
+                candle["open_usd"], candle["open_at"] = price, fetched_at
+            if fetched_at >= candle["close_at"]:
+                candle["close_usd"], candle["close_at"] = price, fetched_at
+                candle["volume_24h_usd"] = point.volume_24h_usd
+    return candles
+
+
+def _merge_into(current: PriceCandle, row: Dict[str, Any]):
+    current.high_usd = max(current.high_usd, row["high_usd"])
+    current.low_usd = min(current.low_usd, row["low_usd"])
+    current.tick_count += row["tick_count"]
+    if row["open_at"] < current.open_at:
+        current.open_usd, current.open_at = row["open_usd"], row["open_at"]
+    if row["close_at"] >= current.close_at:
+        current.close_usd, current.close_at = row["close_usd"], row["close_at"]
+        current.volume_24h_usd = row["volume_24h_usd"]
+
+
+def upsert_candles(db: Session, points: Iterable[Any]) -> int:
+    """
+    Merge a batch of price points into the candles it touches.
+
+    Does not commit, like upsert_latest_prices: it runs in the price history
+    transaction. Only the buckets touched by the batch are written, each in
+    one INSERT ... ON CONFLICT that widens high/low, adds the tick count and
+    replaces open/close only with earlier/later ticks. Returns the number of
+    candles written.
+    """
+    rows = list(aggregate_points(points).values())
+    if not rows:
+        return 0
+
+    upsert_insert = get_upsert_insert(db)
+    if upsert_insert is None:
+        for row in rows:
+            key = (row["coin_id"], row["source"], row["resolution"], row["bucket_start"])
+            current = db.get(PriceCandle, key)
+            if current is None:
+                db.add(PriceCandle(**row))
+            else:
+                _merge_into(current, row)
+        db.flush()
+        return len(rows)
+
+    # Multi-argument scalar max/min: greatest/least on PostgreSQL, max/min on SQLite
+    if db.get_bind().dialect.name == "postgresql":
+        greatest, least = func.greatest, func.least
+    else:
+        greatest, least = func.max, func.min
+
+    stmt = upsert_insert(PriceCandle).values(rows)
+    new = stmt.excluded
+    earlier = new.open_at < PriceCandle.open_at
+    later = new.close_at >= PriceCandle.close_at
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PriceCandle.coin_id, PriceCandle.source, PriceCandle.resolution, PriceCandle.bucket_start],
+        set_={
+            "high_usd": greatest(PriceCandle.high_usd, new.high_usd),
+            "low_usd": least(PriceCandle.low_usd, new.low_usd),
+            "tick_count": PriceCandle.tick_count + new.tick_count,
+            "open_usd": case((earlier, new.open_usd), else_=PriceCandle.open_usd),
+            "open_at": case((earlier, new.open_at), else_=PriceCandle.open_at),
+            "close_usd": case((later, new.close_usd), else_=PriceCandle.close_usd),
+            "close_at": case((later, new.close_at), else_=PriceCandle.close_at),
+            "volume_24h_usd": case((later, new.volume_24h_usd), else_=PriceCandle.volume_24h_usd),
+        },
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+def get_candles(
+    db: Session,
+    coin_id: int,
+    source: str,
+    start: datetime,
+    end: datetime,
+    resolution: Optional[str] = None,
+) -> Tuple[str, List[PriceCandle]]:
+    """Candles overlapping [start, end), oldest first, at the given or best-fitting resolution."""
+    resolution = resolution or choose_resolution(start, end)
+    candles = (
+        db.query(PriceCandle)
+        .filter(
+            PriceCandle.coin_id == coin_id,
+            PriceCandle.source == source,
+            PriceCandle.resolution == resolution,
+            PriceCandle.bucket_start >= bucket_start(start, resolution),
+            PriceCandle.bucket_start < end,
+        )
+        .order_by(PriceCandle.bucket_start)
+        .all()
+    )
+    return resolution, candles
+
+
+def rebuild_candles(db: Session, chunk_size: int = 10000) -> int:
+    """
+    Recompute all candles from the price history in one transaction, e.g. to
+    backfill history written before rollups existed. Streams the history in
+    fetched_at order; returns the number of price rows folded in.
+    """
+    try:
+        db.query(PriceCandle).delete(synchronize_session=False)
+        count, chunk = 0, []
+        query = db.query(
+            AssetPrice.coin_id, AssetPrice.source, AssetPrice.price_usd,
+            AssetPrice.volume_24h_usd, AssetPrice.fetched_at,
+        ).order_by(AssetPrice.fetched_at).execution_options(yield_per=chunk_size)
+        for price in query:
+            chunk.append(price)
+            if len(chunk) >= chunk_size:
+                upsert_candles(db, chunk)
+                count, chunk = count + len(chunk), []
+        upsert_candles(db, chunk)
+        count += len(chunk)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding price candles: {e}")
+        raise
+    logger.info(f"Rebuilt price_candles from {count} history rows")
+    return count
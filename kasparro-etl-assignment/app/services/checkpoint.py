@@ -2,11 +2,24 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+from typing import Optional, Tuple
 import uuid
 from app.core.models import ETLCheckpoint
 from app.core.logging import logger
 
 
+def checkpoint_summary(checkpoint: Optional[ETLCheckpoint]) -> dict:
+    """Public view of a checkpoint; a source without one is reported as pending."""
+    if checkpoint is None:
+        return {"last_processed_id": None, "last_processed_at": None, "status": "pending", "run_id": None}
+    return {
+        "last_processed_id": checkpoint.last_processed_id,
+        "last_processed_at": checkpoint.last_processed_at.isoformat() if checkpoint.last_processed_at else None,
+        "status": checkpoint.status,
+        "run_id": checkpoint.run_id,
+    }
+
+
 class CheckpointService:
     """Service for managing ETL checkpoints."""
     
@@ -40,10 +53,27 @@ class CheckpointService:
         self.db.commit()
         return checkpoint.run_id
     
-    def update_progress(self, source: str, last_processed_id: int):
-        """Update checkpoint with progress. Only called on successful batch processing."""
+    def update_progress(
+        self,
+        source: str,
+        last_processed_id: Optional[int],
+        position: Optional[Tuple[int, int, Optional[str]]] = None,
+    ):
+        """
+        Update checkpoint with progress. Only called on successful batch processing.
+        
+        `position` is the (byte offset, row number, file fingerprint) resume
+        position of file sources.
+        """
         checkpoint = self.get_checkpoint(source)
-        checkpoint.last_processed_id = last_processed_id
+        if last_processed_id is not None:
+            checkpoint.last_processed_id = last_processed_id
+        if position is not None:
+            (
+                checkpoint.last_byte_offset,
+                checkpoint.last_row_number,
+                checkpoint.last_file_fingerprint,
+            ) = position
         checkpoint.last_processed_at = datetime.utcnow()
         # Don't update status here - only on completion or failure
         self.db.commit()
@@ -69,3 +99,10 @@ class CheckpointService:
         checkpoint = self.get_checkpoint(source)
         return checkpoint.last_processed_id if checkpoint else None
 
+    
+    def get_position(self, source: str) -> Optional[Tuple[int, int, Optional[str]]]:
+        """Get the (byte offset, row number, file fingerprint) resume position for a file source."""
+        checkpoint = self.get_checkpoint(source)
+        if checkpoint.last_byte_offset is None:
+            return None
+        return checkpoint.last_byte_offset, checkpoint.last_row_number or 0, checkpoint.last_file_fingerprint
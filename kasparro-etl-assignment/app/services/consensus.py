@@ -0,0 +1,132 @@
+"""Cross-source consensus price per coin, computed column-wise with NumPy."""
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Sequence
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.logging import logger
+from app.core.models import Asset, ConsensusPrice
+from app.services.symbol_resolver import symbol_resolver
+
+
+class ConsensusColumns(NamedTuple):
+    """Per-symbol consensus statistics, one array element per symbol."""
+    symbols: np.ndarray
+    median: np.ndarray
+    vwap: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    spread_pct: np.ndarray
+    source_count: np.ndarray
+    total_volume: np.ndarray
+
+
+def compute_consensus(
+    symbols: Sequence[str],
+    prices: Sequence[float],
+    volumes: Sequence[Optional[float]],
+    sources: Optional[Sequence[str]] = None,
+) -> ConsensusColumns:
+    """
+    Group quotes by symbol and reduce every group at once.
+
+    With `sources`, each source contributes one quote per symbol (its highest
+    volume one), so aliases listed by the same source are not weighted twice
+    and source_count counts sources rather than quotes. Quotes are sorted by (symbol, price) so each group is a contiguous, ordered
+    run: min, max and median are then plain index lookups at the group offsets.
+    The volume-weighted price uses bincount with weights; symbols where no
+    source reports volume fall back to the median. Non-positive or missing
+    prices are dropped beforehand, missing volumes count as zero.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    volumes = np.asarray([np.nan if v is None else v for v in volumes], dtype=np.float64)
+    symbols = np.asarray(symbols, dtype=object)
+
+    valid = np.isfinite(prices) & (prices > 0)
+    prices, volumes, symbols = prices[valid], volumes[valid], symbols[valid]
+    volumes = np.where(np.isfinite(volumes) & (volumes > 0), volumes, 0.0)
+
+    unique, codes = np.unique(symbols.astype(str), return_inverse=True)
+    codes = codes.ravel()
+    if sources is not None:
+        _, source_codes = np.unique(np.asarray(sources, dtype=object)[valid].astype(str), return_inverse=True)
+        pairs = codes * (source_codes.max(initial=0) + 1) + source_codes.ravel()
+        # Highest volume first within each (symbol, source) pair, then keep the first of each run
+        keep = np.lexsort((-volumes, pairs))
+        first = np.concatenate(([True], pairs[keep][1:] != pairs[keep][:-1]))
+        keep = keep[first]
+        prices, volumes, codes = prices[keep], volumes[keep], codes[keep]
+    order = np.lexsort((prices, codes))
+    prices, volumes, codes = prices[order], volumes[order], codes[order]
+
+    counts = np.bincount(codes, minlength=len(unique))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp) if len(unique) else counts
+    ends = starts + counts - 1
+
+    low = prices[starts]
+    high = prices[ends]
+    # Middle element for odd counts, mean of the two middle elements for even counts
+    median = (prices[starts + (counts - 1) // 2] + prices[starts + counts // 2]) / 2
+
+    total_volume = np.bincount(codes, weights=volumes, minlength=len(unique))
+    weighted = np.bincount(codes, weights=prices * volumes, minlength=len(unique))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = np.where(total_volume > 0, weighted / total_volume, median)
+    spread_pct = (high - low) / median * 100
+
+    return ConsensusColumns(unique, median, vwap, low, high, spread_pct, counts, total_volume)
+
+
+def run_consensus(db: Session, computed_at: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Recompute consensus_prices from the unified assets table.
+
+    All current quotes are read in one query, symbols are mapped to their
+    canonical form, and the table is replaced inside a single transaction so
+    readers see either the previous or the new consensus.
+    """
+    rows = (
+        db.query(Asset.symbol, Asset.price_usd, Asset.volume_24h, Asset.source)
+        .filter(Asset.price_usd.isnot(None))
+        .all()
+    )
+    computed_at = computed_at or datetime.utcnow()
+    if not rows:
+        return {"symbols": 0, "quotes": 0}
+
+    symbols, prices, volumes, sources = zip(*rows)
+    result = compute_consensus(symbol_resolver.resolve_many(symbols), prices, volumes, sources)
+
+    records = [
+        {
+            "symbol": symbol,
+            "median_price_usd": median,
+            "vwap_price_usd": vwap,
+            "min_price_usd": low,
+            "max_price_usd": high,
+            "spread_pct": spread,
+            "source_count": count,
+            "total_volume_24h": volume if volume > 0 else None,
+            "computed_at": computed_at,
+        }
+        for symbol, median, vwap, low, high, spread, count, volume in zip(
+            result.symbols.tolist(),
+            result.median.tolist(),
+            result.vwap.tolist(),
+            result.low.tolist(),
+            result.high.tolist(),
+            result.spread_pct.tolist(),
+            result.source_count.tolist(),
+            result.total_volume.tolist(),
+        )
+    ]
+    try:
+        db.query(ConsensusPrice).delete(synchronize_session=False)
+        if records:
+            db.execute(ConsensusPrice.__table__.insert(), records)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"Computed consensus prices for {len(records)} symbols from {len(rows)} quotes")
+    return {"symbols": len(records), "quotes": len(rows)}
@@ -1,12 +1,18 @@
 """ETL runner with checkpoint-based recovery."""
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Callable, Optional
+import httpx
 from sqlalchemy.orm import Session
 from app.ingestion.base import IngestionSource
 from app.ingestion.coinpaprika import CoinPaprikaSource
 from app.ingestion.coingecko import CoinGeckoSource
 from app.ingestion.csv_source import CSVSource
-from app.services.checkpoint import CheckpointService
+from app.services.checkpoint import CheckpointService, checkpoint_summary
+from app.services.consensus import run_consensus
+from app.services.response_cache import data_version
+from app.core.db import SessionLocal
 from app.core.logging import logger
 from app.core.config import settings
 
@@ -14,12 +20,22 @@ from app.core.config import settings
 class ETLRunner:
     """Main ETL runner with failure recovery."""
     
-    def __init__(self, db: Session):
+    # Keys of self.sources, for callers that only need the names (no session required)
+    SOURCE_NAMES = ("coinpaprika", "coingecko", "csv_source")
+    
+    def __init__(
+        self,
+        db: Session,
+        session_factory: Callable[[], Session] = SessionLocal,
+        http_client: Optional[httpx.Client] = None,
+    ):
         self.db = db
+        self.session_factory = session_factory
+        self.http_client = http_client
         self.checkpoint_service = CheckpointService(db)
         self.sources: dict[str, IngestionSource] = {
-            "coinpaprika": CoinPaprikaSource(db),
-            "coingecko": CoinGeckoSource(db),
+            "coinpaprika": CoinPaprikaSource(db, http_client=http_client),
+            "coingecko": CoinGeckoSource(db, http_client=http_client),
             "csv_source": CSVSource(db),
         }
     
@@ -28,58 +44,61 @@ class ETLRunner:
         start_time = time.time()
         records_processed = 0
         run_id = None
+        source = None
         
         try:
             # Start run and get checkpoint
             run_id = self.checkpoint_service.start_run(source_name)
             last_processed_id = self.checkpoint_service.get_last_processed_id(source_name)
+            position = self.checkpoint_service.get_position(source_name)
             
             logger.info(f"Starting ETL for {source_name} (resuming from ID: {last_processed_id})")
             
             source = self.sources[source_name]
+            source.reset_run_state()
             
-            # Fetch data
-            raw_data = source.fetch_data(last_processed_id)
-            if not raw_data:
-                logger.warning(f"No data fetched from {source_name}")
-                self.checkpoint_service.complete_run(source_name)
-                return {
-                    "source": source_name,
-                    "status": "completed",
-                    "records_processed": 0,
-                    "duration": time.time() - start_time,
-                    "run_id": run_id,
-                }
-            
-            # Process in batches
+            # Fetch and process in batches; sources may stream batches as data arrives
             batch_size = settings.ETL_BATCH_SIZE
-            total_records = len(raw_data)
+            batch_count = 0
             
-            for i in range(0, total_records, batch_size):
-                batch = raw_data[i:i + batch_size]
+            for batch in source.iter_batches(last_processed_id, batch_size, position):
+                batch_count += 1
+                
+                # Drop records whose payload is byte-for-byte unchanged since the last run
+                batch, hashes = source.filter_unchanged(batch)
                 
-                # Save raw data first
-                batch_ids = []
-                for record in batch:
-                    raw_id = source.save_raw(record)
-                    batch_ids.append(raw_id)
+                # Save raw data first (one multi-row insert per batch)
+                batch_ids = source.save_raw_batch(batch, hashes)
                 
-                # Process batch
-                processed = source.process_batch(batch)
+                # Process batch, then remember the hashes of the records it saved;
+                # failed records keep no hash, so the next run retries them
+                changed_before = source.stats["unified_changed"]
+                saved = source.process_batch(batch) if batch else []
+                if source.stats["unified_changed"] > changed_before:
+                    # Committed changes to assets: cached /data responses are now stale
+                    data_version.bump()
+                processed = len(saved)
                 records_processed += processed
+                source.remember_hashes(
+                    [batch[i] for i in saved], [hashes[i] for i in saved], [batch_ids[i] for i in saved]
+                )
                 
                 # Update checkpoint after successful batch
                 last_id = batch_ids[-1] if batch_ids else None
-                if last_id:
-                    self.checkpoint_service.update_progress(source_name, last_id)
+                if last_id or source.position is not None:
+                    self.checkpoint_service.update_progress(source_name, last_id, source.position)
                 
                 # Failure injection for testing
                 if settings.FAIL_AFTER_N_RECORDS is not None and records_processed >= settings.FAIL_AFTER_N_RECORDS:
                     raise Exception(f"Failure injection triggered after {records_processed} records")
                 
-                logger.info(f"Processed batch {i//batch_size + 1} for {source_name}: {processed} records")
+                logger.info(f"Processed batch {batch_count} for {source_name}: {processed} records")
+            
+            if batch_count == 0:
+                logger.warning(f"No data fetched from {source_name}")
             
             # Mark as completed
+            source.finalize_run()
             self.checkpoint_service.complete_run(source_name)
             
             duration = time.time() - start_time
@@ -89,6 +108,11 @@ class ETLRunner:
                 "source": source_name,
                 "status": "completed",
                 "records_processed": records_processed,
+                "records_failed": source.stats["failed"],
+                "records_skipped_unchanged": source.stats["skipped_unchanged"],
+                "not_modified": source.stats["not_modified"],
+                "unified_changed": source.stats["unified_changed"],
+                "unified_unchanged": source.stats["unified_unchanged"],
                 "duration": duration,
                 "run_id": run_id,
             }
@@ -100,41 +124,96 @@ class ETLRunner:
             
             logger.error(f"ETL failed for {source_name} after {duration:.2f}s: {e}", exc_info=True)
             
+            stats = source.stats if source else {}
             return {
                 "source": source_name,
                 "status": "failed",
                 "records_processed": records_processed,
+                "records_failed": stats.get("failed", 0),
+                "records_skipped_unchanged": stats.get("skipped_unchanged", 0),
+                "not_modified": stats.get("not_modified", 0),
+                "unified_changed": stats.get("unified_changed", 0),
+                "unified_unchanged": stats.get("unified_unchanged", 0),
                 "duration": duration,
                 "error": str(e),
                 "run_id": run_id,
             }
     
-    def run_all(self) -> dict:
-        """Run ETL for all sources."""
+    def run_all(self, concurrent: Optional[bool] = None, max_workers: Optional[int] = None) -> dict:
+        """
+        Run ETL for all sources, then recompute cross-source consensus prices.
+        
+        In concurrent mode each source runs in its own worker thread with its own
+        session from the session factory, so a failure in one source cannot affect
+        the others. Parallelism is capped by max_workers (ETL_MAX_WORKERS).
+        """
+        if concurrent is None:
+            concurrent = settings.ETL_CONCURRENT_SOURCES
         results = {}
         overall_start = time.time()
         
-        for source_name in self.sources.keys():
-            results[source_name] = self.run_source(source_name)
+        if concurrent:
+            workers = max(1, min(max_workers or settings.ETL_MAX_WORKERS, len(self.sources)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl") as executor:
+                futures = {
+                    source_name: executor.submit(self._run_source_isolated, source_name)
+                    for source_name in self.sources.keys()
+                }
+                for source_name, future in futures.items():
+                    results[source_name] = future.result()
+        else:
+            for source_name in self.sources.keys():
+                results[source_name] = self.run_source(source_name)
+        
+        consensus = None
+        if settings.ETL_CONSENSUS_ENABLED:
+            try:
+                consensus = run_consensus(self.db)
+            except Exception as e:
+                logger.error(f"Consensus computation failed: {e}", exc_info=True)
         
         return {
             "overall_duration": time.time() - overall_start,
             "sources": results,
+            "consensus": consensus,
+            "source_durations": {name: result["duration"] for name, result in results.items()},
+            "mode": "concurrent" if concurrent else "sequential",
             "timestamp": datetime.utcnow().isoformat(),
         }
     
+    def _run_source_isolated(self, source_name: str) -> dict:
+        """Run a single source on a dedicated session (used by concurrent mode)."""
+        start_time = time.time()
+        try:
+            db = self.session_factory()
+            try:
+                runner = ETLRunner(db, session_factory=self.session_factory, http_client=self.http_client)
+                return runner.run_source(source_name)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"ETL worker for {source_name} crashed: {e}", exc_info=True)
+            return {
+                "source": source_name,
+                "status": "failed",
+                "records_processed": 0,
+                "records_failed": 0,
+                "records_skipped_unchanged": 0,
+                "not_modified": 0,
+                "unified_changed": 0,
+                "unified_unchanged": 0,
+                "duration": time.time() - start_time,
+                "error": str(e),
+                "run_id": None,
+            }
+    
     def get_stats(self) -> dict:
         """Get ETL statistics from checkpoints."""
         stats = {}
         
         for source_name in self.sources.keys():
             checkpoint = self.checkpoint_service.get_checkpoint(source_name)
-            stats[source_name] = {
-                "last_processed_id": checkpoint.last_processed_id,
-                "last_processed_at": checkpoint.last_processed_at.isoformat() if checkpoint.last_processed_at else None,
-                "status": checkpoint.status,
-                "run_id": checkpoint.run_id,
-            }
+            stats[source_name] = checkpoint_summary(checkpoint)
         
         return stats
 
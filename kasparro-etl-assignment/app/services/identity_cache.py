@@ -0,0 +1,125 @@
+"""In-process cache of (source, source_id) -> canonical coin identities."""
+import threading
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, bindparam, update
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.models import Coin, CoinSourceMapping
+
+
+class CoinIdentity(NamedTuple):
+    """Plain, session-independent copy of the canonical coin a mapping points to."""
+    coin_id: int
+    symbol: str
+    name: str
+
+    @classmethod
+    def of(cls, coin: Coin) -> "CoinIdentity":
+        return cls(coin.id, coin.symbol, coin.name)
+
+
+class CoinIdentityCache:
+    """
+    Bounded LRU cache of source mappings, warmed from coin_source_mappings.
+
+    Entries are only added once the mapping they describe has been committed,
+    so a cached identity always refers to an existing coin. Mappings are never
+    cached negatively: an unknown (source, source_id) always falls through to
+    the database, where a mapping created by another process will be found.
+
+    last_seen updates for cache hits are collected in memory and written in one
+    executemany UPDATE by flush_last_seen().
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self._entries = LRUCache(
+            maxsize or settings.IDENTITY_CACHE_MAX_SIZE,
+            ttl_seconds if ttl_seconds is not None else settings.IDENTITY_CACHE_TTL_SECONDS,
+        )
+        self._lock = threading.Lock()
+        self._pending_last_seen: Dict[Tuple[str, str], datetime] = {}
+
+    def warm(self, db: Session) -> int:
+        """Load the most recently seen mappings, up to the cache size."""
+        rows = (
+            db.query(CoinSourceMapping.source, CoinSourceMapping.source_id, Coin.id, Coin.symbol, Coin.name)
+            .join(Coin, Coin.id == CoinSourceMapping.coin_id)
+            .order_by(CoinSourceMapping.last_seen.desc())
+            .limit(self._entries.maxsize)
+            .all()
+        )
+        # Insert oldest first so the most recently seen mappings end up most recently used
+        for source, source_id, coin_id, symbol, name in reversed(rows):
+            self._entries.put((source, source_id), CoinIdentity(coin_id, symbol, name))
+        logger.info(f"Warmed coin identity cache with {len(rows)} mappings")
+        return len(rows)
+
+    def lookup(self, source: str, source_id: str) -> Optional[CoinIdentity]:
+        return self._entries.get((source, source_id))
+
+    def remember(self, source: str, source_id: str, identity: CoinIdentity):
+        self._entries.put((source, source_id), identity)
+
+    def invalidate(self, source: str, source_id: str):
+        self._entries.invalidate((source, source_id))
+        with self._lock:
+            self._pending_last_seen.pop((source, source_id), None)
+
+    def clear(self):
+        self._entries.clear()
+        with self._lock:
+            self._pending_last_seen.clear()
+
+    @staticmethod
+    def attach(db: Session, identity: CoinIdentity) -> Coin:
+        """
+        Return a session-bound Coin for a cached identity without a SELECT.
+        Columns not held in the cache (timestamps) load lazily if accessed.
+        """
+        coin = Coin(id=identity.coin_id, symbol=identity.symbol, name=identity.name)
+        make_transient_to_detached(coin)
+        return db.merge(coin, load=False)
+
+    def touch(self, source: str, source_id: str, seen_at: Optional[datetime] = None):
+        """Defer a last_seen update until the next flush_last_seen()."""
+        with self._lock:
+            self._pending_last_seen[(source, source_id)] = seen_at or datetime.utcnow()
+
+    def flush_last_seen(self, db: Session) -> int:
+        """Write all deferred last_seen updates in one batch; returns the number of mappings."""
+        with self._lock:
+            pending, self._pending_last_seen = self._pending_last_seen, {}
+        if not pending:
+            return 0
+
+        mappings = CoinSourceMapping.__table__
+        stmt = (
+            update(mappings)
+            .where(and_(mappings.c.source == bindparam("b_source"), mappings.c.source_id == bindparam("b_source_id")))
+            .values(last_seen=bindparam("b_last_seen"))
+        )
+        try:
+            db.execute(stmt, [
+                {"b_source": source, "b_source_id": source_id, "b_last_seen": seen_at}
+                for (source, source_id), seen_at in pending.items()
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the updates for the next flush unless a newer touch replaced them
+            with self._lock:
+                for key, seen_at in pending.items():
+                    self._pending_last_seen.setdefault(key, seen_at)
+            raise
+        return len(pending)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pending = len(self._pending_last_seen)
+        return {**self._entries.snapshot(), "pending_last_seen": pending}
+
+
+coin_identity_cache = CoinIdentityCache()
@@ -0,0 +1,106 @@
+"""Maintenance of the latest_prices table (current price per coin and source)."""
+from typing import Any, Dict, Iterable, Tuple
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.core.db import get_upsert_insert
+from app.core.logging import logger
+from app.core.models import AssetPrice, LatestPrice
+
+LATEST_COLUMNS = (
+    "coin_id", "source", "price_usd", "market_cap_usd", "volume_24h_usd",
+    "percent_change_24h", "source_timestamp", "fetched_at",
+)
+
+
+def upsert_latest_prices(db: Session, points: Iterable[Any]):
+    """
+    Fold price points (PricePoint or AssetPrice) into latest_prices.
+
+    Does not commit: callers run it in the same transaction as the history
+    insert so both tables always move together. A point only replaces the
+    stored row if it is at least as recent, so late or replayed batches
+    cannot roll the current price back.
+    """
+    newest: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for point in points:
+        row = {column: getattr(point, column) for column in LATEST_COLUMNS}
+        key = (row["coin_id"], row["source"])
+        if key not in newest or newest[key]["fetched_at"] <= row["fetched_at"]:
+            newest[key] = row
+    if not newest:
+        return
+
+    upsert_insert = get_upsert_insert(db)
+    if upsert_insert is None:
+        for row in newest.values():
+            current = db.get(LatestPrice, (row["coin_id"], row["source"]))
+            if current is None:
+                db.add(LatestPrice(**row))
+            elif current.fetched_at <= row["fetched_at"]:
+                for column, value in row.items():
+                    setattr(current, column, value)
+        db.flush()
+        return
+
+    stmt = upsert_insert(LatestPrice).values(list(newest.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LatestPrice.coin_id, LatestPrice.source],
+        set_={column: stmt.excluded[column] for column in LATEST_COLUMNS[2:]},
+        where=LatestPrice.fetched_at <= stmt.excluded.fetched_at,
+    )
+    db.execute(stmt)
+
+
+def latest_from_history():
+    """SELECT of the newest asset_prices row per (coin_id, source)."""
+    ranked = select(
+        *(getattr(AssetPrice, column) for column in LATEST_COLUMNS),
+        func.row_number().over(
+            partition_by=(AssetPrice.coin_id, AssetPrice.source),
+            order_by=(AssetPrice.fetched_at.desc(), AssetPrice.id.desc()),
+        ).label("rank"),
+    ).subquery()
+    return select(*(ranked.c[column] for column in LATEST_COLUMNS)).where(ranked.c.rank == 1)
+
+
+def verify_latest_prices(db: Session) -> dict:
+    """
+    Compare latest_prices with what the history says it should hold.
+    Reads the full history once; meant for occasional consistency checks.
+    """
+    expected = {
+        (row.coin_id, row.source): row
+        for row in db.execute(latest_from_history()).all()
+    }
+    actual = {(row.coin_id, row.source): row for row in db.query(LatestPrice).all()}
+
+    missing = [key for key in expected if key not in actual]
+    orphaned = [key for key in actual if key not in expected]
+    stale = [
+        key for key, row in expected.items()
+        if key in actual and (
+            actual[key].fetched_at != row.fetched_at or actual[key].price_usd != row.price_usd
+        )
+    ]
+    return {
+        "checked": len(expected),
+        "missing": len(missing),
+        "stale": len(stale),
+        "orphaned": len(orphaned),
+        "consistent": not (missing or stale or orphaned),
+    }
+
+
+def rebuild_latest_prices(db: Session) -> int:
+    """Recompute latest_prices from the price history in one transaction; returns the row count."""
+    try:
+        db.query(LatestPrice).delete(synchronize_session=False)
+        db.execute(insert(LatestPrice).from_select(list(LATEST_COLUMNS), latest_from_history()))
+        count = db.query(func.count()).select_from(LatestPrice).scalar()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding latest prices: {e}")
+        raise
+    logger.info(f"Rebuilt latest_prices from history: {count} rows")
+    return count
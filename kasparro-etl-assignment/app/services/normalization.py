@@ -1,37 +1,60 @@
+import csv
+import io
+from sqlalchemy import insert, tuple_
 from sqlalchemy.orm import Session
-from app.core.models import Coin, CoinSourceMapping, AssetPrice
-from datetime import datetime
-from typing import Optional, Dict, Any
+from app.core.config import settings
+from app.core.db import get_upsert_insert
+from app.core.models import Coin, CoinSourceMapping, AssetPrice, LatestPrice
+from app.services.candles import upsert_candles
+from app.services.latest_prices import upsert_latest_prices
+from app.services.identity_cache import CoinIdentity, coin_identity_cache
+from app.services.symbol_resolver import DEFAULT_ALIASES, symbol_resolver
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Iterable, List, NamedTuple, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class CoinRef(NamedTuple):
+    """One source record to resolve to a canonical coin."""
+    source: str
+    source_id: str
+    symbol: str
+    name: str
+    source_symbol: Optional[str] = None
+    source_name: Optional[str] = None
+
+
+class PricePoint(NamedTuple):
+    """One price observation for the bulk append path."""
+    coin_id: int
+    source: str
+    price_usd: float
+    market_cap_usd: Optional[float] = None
+    volume_24h_usd: Optional[float] = None
+    percent_change_24h: Optional[float] = None
+    source_timestamp: Optional[datetime] = None
+    fetched_at: Optional[datetime] = None
+
+
+PRICE_COLUMNS = PricePoint._fields
+
+
 class CoinNormalizationService:
     """
     Handles the unification of coins across multiple data sources.
     This is the KEY service that fixes the -20 point deduction.
     """
     
-    # Symbol normalization rules (handle inconsistencies across sources)
-    SYMBOL_ALIASES = {
-        'BTC': ['BITCOIN', 'XBT'],
-        'ETH': ['ETHEREUM'],
-        'USDT': ['TETHER'],
-        # Add more as needed
-    }
+    # Built-in symbol normalization rules; the symbol_aliases table extends and
+    # overrides them (see app.services.symbol_resolver)
+    SYMBOL_ALIASES = DEFAULT_ALIASES
     
     @staticmethod
     def normalize_symbol(symbol: str) -> str:
-        """Normalize symbol to canonical form"""
-        symbol = symbol.upper().strip()
-        
-        # Check if this is an alias
-        for canonical, aliases in CoinNormalizationService.SYMBOL_ALIASES.items():
-            if symbol in aliases:
-                return canonical
-        
-        return symbol
+        """Normalize symbol to canonical form (O(1) lookup in the compiled alias index)"""
+        return symbol_resolver.resolve(symbol)
     
     @staticmethod
     def get_or_create_coin(
@@ -56,17 +79,23 @@ class CoinNormalizationService:
         # Step 1: Normalize symbol
         normalized_symbol = CoinNormalizationService.normalize_symbol(symbol)
         
-        # Step 2: Check if we already have a source mapping for this source_id
+        # Step 2: Known source IDs are served from the identity cache with no SQL;
+        # last_seen is flushed in bulk later (coin_identity_cache.flush_last_seen)
+        identity = coin_identity_cache.lookup(source, source_id)
+        if identity is not None:
+            coin_identity_cache.touch(source, source_id)
+            return coin_identity_cache.attach(db, identity)
+        
         existing_mapping = db.query(CoinSourceMapping).filter(
             CoinSourceMapping.source == source,
             CoinSourceMapping.source_id == source_id
         ).first()
         
         if existing_mapping:
-            # Update last seen
-            existing_mapping.last_seen = datetime.utcnow()
-            db.commit()
-            return existing_mapping.coin
+            coin = existing_mapping.coin
+            coin_identity_cache.remember(source, source_id, CoinIdentity.of(coin))
+            coin_identity_cache.touch(source, source_id)
+            return coin
         
         # Step 3: Look for canonical coin by symbol
         canonical_coin = db.query(Coin).filter(
@@ -99,12 +128,15 @@ class CoinNormalizationService:
             last_seen=datetime.utcnow()
         )
         db.add(source_mapping)
+        identity = CoinIdentity.of(canonical_coin)
         
         try:
             db.commit()
+            # Only cache once committed, so entries never point at rolled-back coins
+            coin_identity_cache.remember(source, source_id, identity)
             logger.info(
                 f"Linked {source}:{source_id} to canonical coin "
-                f"{canonical_coin.symbol} (ID: {canonical_coin.id})"
+                f"{identity.symbol} (ID: {identity.coin_id})"
             )
         except Exception as e:
             db.rollback()
@@ -113,6 +145,121 @@ class CoinNormalizationService:
         
         return canonical_coin
     
+    @staticmethod
+    def resolve_batch(db: Session, refs: Iterable[CoinRef]) -> Dict[Tuple[str, str], int]:
+        """
+        Resolve a batch of source records to canonical coin IDs.
+        
+        Batch counterpart of get_or_create_coin using a constant number of
+        queries regardless of batch size: one mapping lookup, one coin lookup by
+        normalized symbol, then (only for unseen records) an INSERT ... ON
+        CONFLICT DO NOTHING plus re-select for coins and for mappings, and a
+        single commit. The re-selects pick up rows inserted concurrently by
+        other workers, so every worker ends up with the same coin IDs.
+        
+        Returns {(source, source_id): coin_id}.
+        """
+        refs_by_key: Dict[Tuple[str, str], CoinRef] = {}
+        for ref in refs:
+            refs_by_key.setdefault((ref.source, ref.source_id), ref)
+        
+        resolved: Dict[Tuple[str, str], int] = {}
+        for key in refs_by_key:
+            identity = coin_identity_cache.lookup(*key)
+            if identity is not None:
+                resolved[key] = identity.coin_id
+                coin_identity_cache.touch(*key)
+        
+        missing = [key for key in refs_by_key if key not in resolved]
+        if not missing:
+            return resolved
+        
+        upsert_insert = get_upsert_insert(db)
+        if upsert_insert is None:
+            # No ON CONFLICT support: fall back to the per-record path
+            for key in missing:
+                ref = refs_by_key[key]
+                coin = CoinNormalizationService.get_or_create_coin(db, **ref._asdict())
+                resolved[key] = coin.id
+            return resolved
+        
+        # 1. Existing mappings
+        found = CoinNormalizationService._select_mappings(db, missing)
+        for key, identity in found.items():
+            resolved[key] = identity.coin_id
+            coin_identity_cache.remember(*key, identity)
+            coin_identity_cache.touch(*key)
+        
+        unmapped = [key for key in missing if key not in found]
+        if not unmapped:
+            return resolved
+        
+        # 2. Canonical coins by normalized symbol, inserting the ones nobody has created yet
+        symbols = dict(zip(
+            unmapped, symbol_resolver.resolve_many(refs_by_key[key].symbol for key in unmapped)
+        ))
+        coins = CoinNormalizationService._select_coins(db, set(symbols.values()))
+        new_coins: Dict[str, Dict[str, Any]] = {}
+        for key in unmapped:
+            symbol = symbols[key]
+            if symbol not in coins and symbol not in new_coins:
+                new_coins[symbol] = {"symbol": symbol, "name": refs_by_key[key].name}
+        
+        try:
+            if new_coins:
+                stmt = upsert_insert(Coin).values(list(new_coins.values()))
+                db.execute(stmt.on_conflict_do_nothing(index_elements=[Coin.symbol]))
+                coins.update(CoinNormalizationService._select_coins(db, set(new_coins)))
+                logger.info(f"Created {len(new_coins)} canonical coins")
+            
+            # 3. Source mappings; on conflict another worker mapped the key first and wins
+            now = datetime.utcnow()
+            mapping_rows = []
+            for key in unmapped:
+                ref = refs_by_key[key]
+                mapping_rows.append({
+                    "coin_id": coins[symbols[key]].coin_id,
+                    "source": ref.source,
+                    "source_id": ref.source_id,
+                    "source_symbol": ref.source_symbol or ref.symbol,
+                    "source_name": ref.source_name or ref.name,
+                    "created_at": now,
+                    "last_seen": now,
+                })
+            stmt = upsert_insert(CoinSourceMapping).values(mapping_rows)
+            db.execute(stmt.on_conflict_do_nothing(
+                index_elements=[CoinSourceMapping.source, CoinSourceMapping.source_id]
+            ))
+            created = CoinNormalizationService._select_mappings(db, unmapped)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error resolving coin batch: {e}")
+            raise
+        
+        # Only cache once committed, so entries never point at rolled-back coins
+        for key, identity in created.items():
+            resolved[key] = identity.coin_id
+            coin_identity_cache.remember(*key, identity)
+        return resolved
+    
+    @staticmethod
+    def _select_mappings(db: Session, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], CoinIdentity]:
+        rows = db.query(
+            CoinSourceMapping.source, CoinSourceMapping.source_id, Coin.id, Coin.symbol, Coin.name
+        ).join(Coin, Coin.id == CoinSourceMapping.coin_id).filter(
+            tuple_(CoinSourceMapping.source, CoinSourceMapping.source_id).in_(keys)
+        ).all()
+        return {
+            (source, source_id): CoinIdentity(coin_id, symbol, name)
+            for source, source_id, coin_id, symbol, name in rows
+        }
+    
+    @staticmethod
+    def _select_coins(db: Session, symbols: set) -> Dict[str, CoinIdentity]:
+        rows = db.query(Coin.id, Coin.symbol, Coin.name).filter(Coin.symbol.in_(symbols)).all()
+        return {symbol: CoinIdentity(coin_id, symbol, name) for coin_id, symbol, name in rows}
+    
     @staticmethod
     def add_price_data(
         db: Session,
@@ -143,6 +290,9 @@ class CoinNormalizationService:
         db.add(price_record)
         
         try:
+            # Same transaction: history, current price and candles never diverge
+            upsert_latest_prices(db, [price_record])
+            upsert_candles(db, [price_record])
             db.commit()
             db.refresh(price_record)
             return price_record
@@ -151,6 +301,61 @@ class CoinNormalizationService:
             logger.error(f"Error adding price data: {e}")
             raise
     
+    @staticmethod
+    def add_price_data_bulk(db: Session, points: Iterable[PricePoint], commit: bool = True) -> int:
+        """
+        Append a batch of price points to the price history in one round trip.
+        
+        Price history is append-only, so nothing is read back: no ORM objects,
+        no RETURNING, no refresh. Uses COPY ... FROM STDIN on PostgreSQL
+        (psycopg2) and a single executemany INSERT elsewhere. latest_prices and
+        the candles touched by the batch are upserted in the same transaction. Points without fetched_at share one
+        timestamp. With commit=False the caller commits, e.g. together with the
+        unified assets of the same ETL batch. Returns the number of rows written.
+        """
+        fetched_at = datetime.utcnow()
+        rows = [
+            point if point.fetched_at is not None else point._replace(fetched_at=fetched_at)
+            for point in points
+        ]
+        if not rows:
+            return 0
+        
+        try:
+            connection = db.connection()
+            if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+                # Same connection and transaction as the session, driven directly for COPY
+                with connection.connection.driver_connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {AssetPrice.__tablename__} ({', '.join(PRICE_COLUMNS)}) "
+                        "FROM STDIN WITH (FORMAT csv)",
+                        CoinNormalizationService._copy_buffer(rows),
+                    )
+            else:
+                db.execute(insert(AssetPrice.__table__), [row._asdict() for row in rows])
+            upsert_latest_prices(db, rows)
+            upsert_candles(db, rows)
+            if commit:
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error bulk adding price data: {e}")
+            raise
+        return len(rows)
+    
+    @staticmethod
+    def _copy_buffer(rows: List[PricePoint]) -> io.StringIO:
+        """CSV body for COPY; None becomes an unquoted empty field, i.e. NULL."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else ("" if value is None else value)
+                for value in row
+            ])
+        buffer.seek(0)
+        return buffer
+    
     @staticmethod
     def get_coin_by_symbol(db: Session, symbol: str) -> Optional[Coin]:
         """Get canonical coin by symbol"""
@@ -160,19 +365,59 @@ class CoinNormalizationService:
     @staticmethod
     def get_coin_by_source_id(db: Session, source: str, source_id: str) -> Optional[Coin]:
         """Get canonical coin by source-specific ID"""
+        identity = coin_identity_cache.lookup(source, source_id)
+        if identity is not None:
+            return coin_identity_cache.attach(db, identity)
+        
         mapping = db.query(CoinSourceMapping).filter(
             CoinSourceMapping.source == source,
             CoinSourceMapping.source_id == source_id
         ).first()
         
-        return mapping.coin if mapping else None
+        if not mapping:
+            return None
+        coin_identity_cache.remember(source, source_id, CoinIdentity.of(mapping.coin))
+        return mapping.coin
     
     @staticmethod
-    def get_latest_price(db: Session, coin_id: int) -> Optional[AssetPrice]:
-        """Get most recent price for a canonical coin"""
-        return db.query(AssetPrice).filter(
-            AssetPrice.coin_id == coin_id
-        ).order_by(AssetPrice.fetched_at.desc()).first()
+    def get_latest_price(db: Session, coin_id: int, source: Optional[str] = None) -> Optional[LatestPrice]:
+        """
+        Get the current price for a canonical coin from latest_prices.
+        
+        With a source this is a primary-key read; without one it reads the
+        coin's few per-source rows (a PK prefix scan) and returns the newest.
+        """
+        if source is not None:
+            return db.get(LatestPrice, (coin_id, source))
+        return db.query(LatestPrice).filter(
+            LatestPrice.coin_id == coin_id
+        ).order_by(LatestPrice.fetched_at.desc()).first()
+    
+    @staticmethod
+    def get_latest_price_from_history(db: Session, coin_id: int) -> Optional[AssetPrice]:
+        """
+        Get most recent price for a canonical coin straight from the history.
+        
+        Searches the last PRICE_LATEST_LOOKBACK_DAYS first so PostgreSQL prunes
+        all but the newest partitions; only coins with no recent price fall
+        back to scanning the whole history.
+        """
+        query = db.query(AssetPrice).filter(AssetPrice.coin_id == coin_id)
+        since = datetime.utcnow() - timedelta(days=settings.PRICE_LATEST_LOOKBACK_DAYS)
+        latest = query.filter(AssetPrice.fetched_at >= since).order_by(AssetPrice.fetched_at.desc()).first()
+        if latest is not None:
+            return latest
+        return query.order_by(AssetPrice.fetched_at.desc()).first()
+    
+    @staticmethod
+    def get_price_history(
+        db: Session, coin_id: int, start: datetime, end: Optional[datetime] = None, limit: int = 1000
+    ) -> List[AssetPrice]:
+        """Prices for a coin in [start, end), newest first; the range limits the scan to matching partitions"""
+        query = db.query(AssetPrice).filter(AssetPrice.coin_id == coin_id, AssetPrice.fetched_at >= start)
+        if end is not None:
+            query = query.filter(AssetPrice.fetched_at < end)
+        return query.order_by(AssetPrice.fetched_at.desc()).limit(limit).all()
     
     @staticmethod
     def get_all_sources_for_coin(db: Session, coin_id: int) -> list:
@@ -249,4 +494,47 @@ def transform_coingecko_to_normalized(db: Session, raw_data: dict):
             percent_change_24h=raw_data.get('price_change_percentage_24h')
         )
     
-    return coin
\ No newline at end of file
+    return coin
+
+
+def transform_batch_to_normalized(db: Session, source: str, raw_records: List[dict]) -> Dict[Tuple[str, str], int]:
+    """
+    Batch version of the per-record transforms above: resolves every record with
+    resolve_batch and appends all price rows with add_price_data_bulk. Returns the
+    resolved {(source, source_id): coin_id} map.
+    """
+    refs = []
+    prices = []
+    for raw_data in raw_records:
+        source_id = raw_data.get('id', '')
+        refs.append(CoinRef(
+            source=source,
+            source_id=source_id,
+            symbol=raw_data.get('symbol', '').upper(),
+            name=raw_data.get('name', ''),
+            source_symbol=raw_data.get('symbol'),
+            source_name=raw_data.get('name'),
+        ))
+        if source == 'coingecko':
+            price = raw_data.get('current_price')
+            extra = {
+                'market_cap_usd': raw_data.get('market_cap'),
+                'volume_24h_usd': raw_data.get('total_volume'),
+                'percent_change_24h': raw_data.get('price_change_percentage_24h'),
+            }
+        else:
+            price = raw_data.get('price_usd')
+            extra = {
+                'market_cap_usd': raw_data.get('market_cap_usd'),
+                'volume_24h_usd': raw_data.get('volume_24h_usd'),
+                'percent_change_24h': raw_data.get('percent_change_24h'),
+            }
+        if price is not None:
+            prices.append((source_id, price, extra))
+    
+    coin_ids = CoinNormalizationService.resolve_batch(db, refs)
+    CoinNormalizationService.add_price_data_bulk(db, [
+        PricePoint(coin_id=coin_ids[(source, source_id)], source=source, price_usd=price, **extra)
+        for source_id, price, extra in prices
+    ])
+    return coin_ids
@@ -0,0 +1,149 @@
+"""Time-range partition maintenance for the asset_prices price history."""
+import re
+from datetime import date, datetime, timedelta
+from typing import List, NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.models import AssetPrice
+
+PARENT_TABLE = AssetPrice.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})(?:_(\d{{2}}))?$")
+
+
+class Partition(NamedTuple):
+    """One time-range partition: rows with start <= fetched_at < end."""
+    name: str
+    start: date
+    end: date
+
+
+def partition_for(day: date, interval: Optional[str] = None) -> Partition:
+    """The daily or monthly partition containing `day`."""
+    interval = interval or settings.PRICE_PARTITION_INTERVAL
+    if interval == "day":
+        return Partition(f"{PARENT_TABLE}_p{day:%Y_%m_%d}", day, day + timedelta(days=1))
+    if interval == "month":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return Partition(f"{PARENT_TABLE}_p{start:%Y_%m}", start, end)
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+
+def parse_partition(name: str) -> Optional[Partition]:
+    """Recover a partition's range from its name; None for the default partition."""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    if day is None:
+        return partition_for(date(int(year), int(month), 1), "month")
+    return partition_for(date(int(year), int(month), int(day)), "day")
+
+
+def is_partitioned(db: Session) -> bool:
+    """True if asset_prices is a native PostgreSQL partitioned table."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent)"),
+        {"parent": PARENT_TABLE},
+    ).first() is not None
+
+
+def list_partitions(db: Session) -> List[Partition]:
+    """Time partitions currently attached to asset_prices, oldest first."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent)"
+    ), {"parent": PARENT_TABLE}).scalars().all()
+    partitions = [p for p in map(parse_partition, names) if p is not None]
+    return sorted(partitions, key=lambda p: p.start)
+
+
+def create_partition(db: Session, partition: Partition):
+    """
+    Create and attach one partition.
+
+    Rows that already landed in the default partition for this range are moved
+    into the new table first, since PostgreSQL refuses to attach a range the
+    default partition still holds rows for.
+    """
+    start, end = f"{partition.start.isoformat()} 00:00:00+00", f"{partition.end.isoformat()} 00:00:00+00"
+    db.execute(text(
+        f"CREATE TABLE {partition.name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE fetched_at >= :start AND fetched_at < :end RETURNING *) "
+        f"INSERT INTO {partition.name} SELECT * FROM moved"
+    ), {"start": start, "end": end})
+    db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {partition.name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None, ahead: Optional[int] = None) -> List[str]:
+    """Create the current partition and the next `ahead` ones if missing; returns created names."""
+    if not is_partitioned(db):
+        return []
+    ahead = settings.PRICE_PARTITIONS_AHEAD if ahead is None else ahead
+    existing = {p.name for p in list_partitions(db)}
+
+    created = []
+    partition = partition_for((now or datetime.utcnow()).date())
+    for _ in range(ahead + 1):
+        if partition.name not in existing:
+            try:
+                create_partition(db, partition)
+                db.commit()
+                created.append(partition.name)
+                logger.info(f"Created price partition {partition.name} [{partition.start}, {partition.end})")
+            except Exception as e:
+                # Another instance may have created it concurrently
+                db.rollback()
+                logger.warning(f"Could not create price partition {partition.name}: {e}")
+        partition = partition_for(partition.end)
+    return created
+
+
+def drop_expired_partitions(
+    db: Session, retention_days: Optional[int] = None, now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Apply price history retention. On a partitioned table whole partitions that
+    end before the cutoff are dropped (no row-by-row DELETE); only stragglers in
+    the default partition are deleted row-wise. Returns dropped partition names.
+    """
+    retention_days = settings.PRICE_RETENTION_DAYS if retention_days is None else retention_days
+    if retention_days is None:
+        return []
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+
+    if not is_partitioned(db):
+        db.query(AssetPrice).filter(AssetPrice.fetched_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        return []
+
+    dropped = []
+    for partition in list_partitions(db):
+        if partition.end > cutoff.date():
+            break
+        db.execute(text(f"DROP TABLE {partition.name}"))
+        db.commit()
+        dropped.append(partition.name)
+        logger.info(f"Dropped expired price partition {partition.name}")
+    db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE fetched_at < :cutoff"), {"cutoff": cutoff})
+    db.commit()
+    return dropped
+
+
+def maintain_price_partitions(db: Session, now: Optional[datetime] = None) -> dict:
+    """Create upcoming partitions and apply retention; safe to run every ETL cycle."""
+    return {
+        "created": ensure_partitions(db, now=now),
+        "dropped": drop_expired_partitions(db, now=now),
+    }
@@ -0,0 +1,300 @@
+"""
+Columnar, compressed archive of old raw_* rows on local disk.
+
+Each archive block is one file holding up to RAW_ARCHIVE_BLOCK_ROWS rows of a
+single raw table, stored column by column:
+
+    MAGIC | header length (8 bytes, little endian) | header JSON | column blobs
+
+Every column is compressed on its own (zlib), so a scan that only needs ids
+or timestamps never decompresses payloads. manifest.json in the archive
+directory lists every block with its table, id range and fetched_at range,
+which lets readers skip blocks outside a time window without opening them.
+"""
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.models import RawCoinGecko, RawCoinPaprika, RawCSVSource
+
+RAW_MODELS = (RawCoinPaprika, RawCoinGecko, RawCSVSource)
+
+MAGIC = b"KRAWCOL1"
+MANIFEST_NAME = "manifest.json"
+COLUMNS = ("id", "fetched_at", "source_name", "content_hash", "payload")
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since the epoch; naive timestamps are UTC, as written by the ETL."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _encode_lines(values: Sequence[Optional[str]]) -> bytes:
+    # JSON-encoded payloads and hex hashes never contain raw newlines
+    return "\n".join("" if value is None else value for value in values).encode("utf-8")
+
+
+def write_block(path: str, table: str, rows: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Write raw rows (id, source_name, payload, content_hash, fetched_at) as one
+    block file and return its manifest entry. The file is written under a
+    temporary name, fsynced and renamed, so a crash never leaves a torn block.
+    """
+    columns = {
+        "id": ("int64", np.array([row.id for row in rows], dtype="<i8").tobytes()),
+        "fetched_at": ("float64", np.array([_epoch(row.fetched_at) for row in rows], dtype="<f8").tobytes()),
+        "source_name": ("lines", _encode_lines([row.source_name for row in rows])),
+        "content_hash": ("lines", _encode_lines([row.content_hash for row in rows])),
+        "payload": ("lines", _encode_lines([
+            json.dumps(row.payload, separators=(",", ":"), ensure_ascii=False) for row in rows
+        ])),
+    }
+
+    blobs, layout, offset = [], {}, 0
+    for name, (encoding, raw) in columns.items():
+        blob = zlib.compress(raw, 6)
+        layout[name] = {"encoding": encoding, "offset": offset, "length": len(blob), "raw_length": len(raw)}
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"table": table, "rows": len(rows), "codec": "zlib", "columns": layout}).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    fetched = [row.fetched_at for row in rows]
+    return {
+        "table": table,
+        "file": os.path.basename(path),
+        "rows": len(rows),
+        "min_id": rows[0].id,
+        "max_id": rows[-1].id,
+        "min_fetched_at": min(fetched).isoformat(),
+        "max_fetched_at": max(fetched).isoformat(),
+        "raw_bytes": sum(column["raw_length"] for column in layout.values()),
+        "file_bytes": os.path.getsize(path),
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+class ArchiveBlock:
+    """
+    Memory-mapped reader for one block file. Columns are decompressed on
+    demand straight from the mapping; nothing is loaded back into the database.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a raw archive block: {path}")
+        (header_length,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._map[header_start:header_start + header_length])
+        self._data_start = header_start + header_length
+
+    @property
+    def table(self) -> str:
+        return self.header["table"]
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    def column(self, name: str):
+        """Decoded column: a NumPy array for id/fetched_at, a list of strings otherwise."""
+        layout = self.header["columns"][name]
+        start = self._data_start + layout["offset"]
+        raw = zlib.decompress(self._map[start:start + layout["length"]])
+        if layout["encoding"] == "int64":
+            return np.frombuffer(raw, dtype="<i8")
+        if layout["encoding"] == "float64":
+            return np.frombuffer(raw, dtype="<f8")
+        return raw.decode("utf-8").split("\n") if len(self) else []
+
+    def records(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Sequence[str] = COLUMNS,
+    ) -> Iterator[Dict[str, Any]]:
+        """Rows with start <= fetched_at < end as dicts, payloads parsed back to JSON."""
+        fetched_at = self.column("fetched_at")
+        mask = np.ones(len(fetched_at), dtype=bool)
+        if start is not None:
+            mask &= fetched_at >= _epoch(start)
+        if end is not None:
+            mask &= fetched_at < _epoch(end)
+        selected = np.flatnonzero(mask)
+        if not len(selected):
+            return
+
+        values = {name: self.column(name) for name in columns}
+        for i in selected.tolist():
+            record = {}
+            for name, column in values.items():
+                value = column[i]
+                if name == "id":
+                    value = int(value)
+                elif name == "fetched_at":
+                    value = datetime.fromtimestamp(float(value), tz=timezone.utc)
+                elif name == "payload":
+                    value = json.loads(value)
+                elif name == "content_hash":
+                    value = value or None
+                record[name] = value
+            yield record
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveBlock":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveManifest:
+    """The list of archive blocks in a directory, rewritten atomically on every change."""
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.path = os.path.join(archive_dir, MANIFEST_NAME)
+        self.blocks: List[Dict[str, Any]] = []
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.blocks = json.load(f)["blocks"]
+
+    def for_table(self, table: str) -> List[Dict[str, Any]]:
+        return [block for block in self.blocks if block["table"] == table]
+
+    def add(self, entry: Dict[str, Any]):
+        self.blocks.append(entry)
+        self.save()
+
+    def save(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "blocks": self.blocks}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def _delete_archived(db: Session, model, entry: Dict[str, Any]) -> int:
+    """
+    Delete the rows a manifest entry covers. Blocks hold the oldest rows of an
+    id range, so every row in [min_id, max_id] fetched no later than the
+    block's newest row is in the block.
+    """
+    deleted = db.query(model).filter(
+        model.id >= entry["min_id"],
+        model.id <= entry["max_id"],
+        model.fetched_at <= datetime.fromisoformat(entry["max_fetched_at"]),
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def archive_raw_table(
+    db: Session,
+    model,
+    cutoff: datetime,
+    manifest: ArchiveManifest,
+    block_rows: Optional[int] = None,
+) -> int:
+    """
+    Move rows of one raw table fetched before `cutoff` into archive blocks.
+
+    Each block is written and recorded in the manifest before its rows are
+    deleted. If a previous run stopped in between, the rows of the table's
+    last block are deleted first instead of being archived twice. Returns the
+    number of rows archived.
+    """
+    block_rows = block_rows or settings.RAW_ARCHIVE_BLOCK_ROWS
+    table = model.__tablename__
+    blocks = manifest.for_table(table)
+    if blocks:
+        _delete_archived(db, model, blocks[-1])
+
+    archived = 0
+    while True:
+        rows = (
+            db.query(model.id, model.source_name, model.payload, model.content_hash, model.fetched_at)
+            .filter(model.fetched_at < cutoff)
+            .order_by(model.id)
+            .limit(block_rows)
+            .all()
+        )
+        if not rows:
+            break
+        path = os.path.join(manifest.archive_dir, f"{table}_{rows[0].id:012d}_{rows[-1].id:012d}.rawcol")
+        entry = write_block(path, table, rows)
+        manifest.add(entry)
+        _delete_archived(db, model, entry)
+        archived += len(rows)
+        logger.info(
+            f"Archived {len(rows)} {table} rows to {entry['file']} "
+            f"({entry['raw_bytes']} -> {entry['file_bytes']} bytes)"
+        )
+    return archived
+
+
+def archive_raw_tables(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Archive raw rows older than RAW_ARCHIVE_AFTER_DAYS for every raw table; no-op when unset."""
+    older_than_days = settings.RAW_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    if older_than_days is None:
+        return {}
+    archive_dir = archive_dir or settings.RAW_ARCHIVE_DIR
+    os.makedirs(archive_dir, exist_ok=True)
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    manifest = ArchiveManifest(archive_dir)
+    return {model.__tablename__: archive_raw_table(db, model, cutoff, manifest) for model in RAW_MODELS}
+
+
+def scan_archive(
+    table: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    archive_dir: Optional[str] = None,
+    columns: Sequence[str] = COLUMNS,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Replay archived rows of one raw table with start <= fetched_at < end, in
+    id order. Blocks whose manifest time range misses the window are skipped
+    without being opened.
+    """
+    manifest = ArchiveManifest(archive_dir or settings.RAW_ARCHIVE_DIR)
+    for entry in manifest.for_table(table):
+        if end is not None and _epoch(datetime.fromisoformat(entry["min_fetched_at"])) >= _epoch(end):
+            continue
+        if start is not None and _epoch(datetime.fromisoformat(entry["max_fetched_at"])) < _epoch(start):
+            continue
+        with ArchiveBlock(os.path.join(manifest.archive_dir, entry["file"])) as block:
+            yield from block.records(start, end, columns)
@@ -0,0 +1,59 @@
+"""Run-versioned in-process cache of API responses built from the assets table."""
+import threading
+from typing import Any, Hashable, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+class DataVersion:
+    """
+    Counter bumped by the ETL runner whenever a batch commits changes to the
+    unified assets table. Cached responses are keyed on the version they were
+    built from, so a bump makes every older entry unreachable at once.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class ResponseCache:
+    """
+    Bounded LRU of response payloads keyed on (data version, normalized query).
+
+    Callers read the version before querying and store the result under that
+    version: a batch committed while the query ran bumps the version, so the
+    possibly stale result is never served. Entries from older versions are
+    left to LRU eviction and the TTL.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self._entries = LRUCache(
+            maxsize or settings.DATA_CACHE_MAX_SIZE,
+            ttl_seconds if ttl_seconds is not None else settings.DATA_CACHE_TTL_SECONDS,
+        )
+
+    def get(self, version: int, key: Hashable) -> Optional[Any]:
+        return self._entries.get((version, key))
+
+    def put(self, version: int, key: Hashable, value: Any):
+        self._entries.put((version, key), value)
+
+    def clear(self):
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return {**self._entries.snapshot(), "data_version": data_version.value}
+
+
+data_version = DataVersion()
+data_response_cache = ResponseCache()
@@ -0,0 +1,125 @@
+"""Compiled alias -> canonical symbol resolution backed by the symbol_aliases table."""
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.logging import logger
+from app.core.models import SymbolAlias
+
+# Built-in rules, used before the table has been loaded and overridden by it
+DEFAULT_ALIASES: Dict[str, List[str]] = {
+    'BTC': ['BITCOIN', 'XBT'],
+    'ETH': ['ETHEREUM'],
+    'USDT': ['TETHER'],
+}
+
+
+def _clean(symbol: str) -> str:
+    return symbol.upper().strip()
+
+
+class SymbolIndex:
+    """
+    Immutable reverse lookup (alias -> canonical) compiled from alias rules.
+
+    Chains such as A -> B -> C are collapsed at compile time so resolution is
+    a single dict lookup. Cycles are broken by keeping the alias unresolved.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]], fingerprint: Optional[str] = None):
+        direct = {_clean(alias): _clean(canonical) for alias, canonical in pairs}
+        compiled = {}
+        for alias in direct:
+            if direct[alias] == alias:
+                continue
+            seen = {alias}
+            target = direct[alias]
+            while target in direct and target not in seen:
+                seen.add(target)
+                target = direct[target]
+            if target in seen:
+                logger.warning(f"Ignoring cyclic symbol alias {alias} -> {direct[alias]}")
+                continue
+            compiled[alias] = target
+        self.aliases: Mapping[str, str] = MappingProxyType(compiled)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_groups(cls, groups: Dict[str, List[str]], fingerprint: Optional[str] = None) -> "SymbolIndex":
+        return cls(((alias, canonical) for canonical, aliases in groups.items() for alias in aliases), fingerprint)
+
+    def resolve(self, symbol: str) -> str:
+        symbol = _clean(symbol)
+        return self.aliases.get(symbol, symbol)
+
+    def resolve_many(self, symbols: Iterable[str]) -> List[str]:
+        get = self.aliases.get
+        return [get(symbol, symbol) for symbol in map(_clean, symbols)]
+
+    def __len__(self) -> int:
+        return len(self.aliases)
+
+
+class SymbolResolver:
+    """
+    Process-wide holder of the current SymbolIndex.
+
+    Readers use whatever index is current without locking; reload() compiles a
+    new index from the table and swaps the reference, so lookups never observe
+    a half-built index. reload_if_changed() hashes the table's (alias,
+    canonical) rows, so any edit, including raw SQL that leaves updated_at
+    alone, is seen; it only recompiles when the hash differs. The table is a
+    handful of rows, so reading it whole is cheap.
+    """
+
+    def __init__(self, defaults: Optional[Dict[str, List[str]]] = None):
+        self.defaults = DEFAULT_ALIASES if defaults is None else defaults
+        self._index = SymbolIndex.from_groups(self.defaults)
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> SymbolIndex:
+        return self._index
+
+    def resolve(self, symbol: str) -> str:
+        return self._index.resolve(symbol)
+
+    def resolve_many(self, symbols: Iterable[str]) -> List[str]:
+        """Resolve a whole batch against one index snapshot."""
+        return self._index.resolve_many(symbols)
+
+    @staticmethod
+    def load_rows(db: Session) -> List[Tuple[str, str]]:
+        return db.query(SymbolAlias.alias, SymbolAlias.canonical).order_by(SymbolAlias.alias).all()
+
+    @staticmethod
+    def fingerprint(rows: Iterable[Tuple[str, str]]) -> str:
+        digest = hashlib.sha256()
+        for alias, canonical in rows:
+            digest.update(f"{alias}\0{canonical}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _install(self, rows: List[Tuple[str, str]], fingerprint: str) -> SymbolIndex:
+        with self._lock:
+            defaults = ((alias, canonical) for canonical, aliases in self.defaults.items() for alias in aliases)
+            # Later pairs win, so table rows override the built-in defaults
+            self._index = SymbolIndex([*defaults, *rows], fingerprint)
+            logger.info(f"Loaded {len(self._index)} symbol aliases")
+            return self._index
+
+    def reload(self, db: Session) -> SymbolIndex:
+        rows = self.load_rows(db)
+        return self._install(rows, self.fingerprint(rows))
+
+    def reload_if_changed(self, db: Session) -> bool:
+        """Recompile the index if the alias table changed since the last load."""
+        rows = self.load_rows(db)
+        fingerprint = self.fingerprint(rows)
+        if fingerprint == self._index.fingerprint:
+            return False
+        self._install(rows, fingerprint)
+        return True
+
+
+symbol_resolver = SymbolResolver()
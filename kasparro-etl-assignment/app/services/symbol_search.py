@@ -0,0 +1,93 @@
+"""In-memory symbol autocomplete over a sorted array of distinct asset symbols."""
+import threading
+import time
+from bisect import bisect_left
+from typing import List, NamedTuple, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.models import Asset
+from app.services.response_cache import data_version
+
+
+class SymbolMatch(NamedTuple):
+    symbol: str
+    name: str
+
+
+class SymbolList:
+    """
+    Immutable sorted array of (symbol, name). Every symbol starting with a
+    prefix sits in one contiguous run, found with a single binary search.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str]], version: Optional[int] = None):
+        entries = sorted(entries)
+        self.symbols: Tuple[str, ...] = tuple(symbol for symbol, _ in entries)
+        self.names: Tuple[str, ...] = tuple(name for _, name in entries)
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def complete(self, prefix: str, limit: int = 10) -> List[SymbolMatch]:
+        prefix = prefix.upper().strip()
+        matches = []
+        for i in range(bisect_left(self.symbols, prefix), len(self.symbols)):
+            if len(matches) >= limit or not self.symbols[i].startswith(prefix):
+                break
+            matches.append(SymbolMatch(self.symbols[i], self.names[i]))
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+class SymbolAutocomplete:
+    """
+    Holder of the current SymbolList. The list is rebuilt lazily on the first
+    lookup after the ETL data version moves or the list is older than the TTL
+    (DATA_CACHE_TTL_SECONDS, which bounds staleness after writes by other
+    processes), with one grouped query, and swapped in by reference so
+    concurrent lookups never see a partial list.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self._list = SymbolList([])
+        self._lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.DATA_CACHE_TTL_SECONDS
+
+    def _is_stale(self, symbols: SymbolList) -> bool:
+        if symbols.version != data_version.value:
+            return True
+        return self.ttl_seconds is not None and time.monotonic() - symbols.loaded_at >= self.ttl_seconds
+
+    def _load(self, db: Session):
+        version = data_version.value
+        rows = db.query(Asset.symbol, func.min(Asset.name)).group_by(Asset.symbol).all()
+        self._list = SymbolList([(symbol, name) for symbol, name in rows if symbol], version)
+        logger.info(f"Loaded {len(self._list)} symbols for autocomplete")
+
+    def reload(self, db: Session) -> SymbolList:
+        with self._lock:
+            self._load(db)
+            return self._list
+
+    def current(self, db: Session) -> SymbolList:
+        symbols = self._list
+        if self._is_stale(symbols):
+            # Concurrent requests after a version bump or expiry wait for one rebuild
+            with self._lock:
+                if self._is_stale(self._list):
+                    self._load(db)
+                symbols = self._list
+        return symbols
+
+    def complete(self, db: Session, prefix: str, limit: int = 10) -> List[SymbolMatch]:
+        return self.current(db).complete(prefix, limit)
+
+    def clear(self):
+        with self._lock:
+            self._list = SymbolList([])
+
+
+symbol_autocomplete = SymbolAutocomplete()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark GET /data under parallel load: sync Session in async routes vs the async session.
+
+Usage:
+    python benchmarks/bench_api_concurrency.py --requests 500 --concurrency 20
+
+Uses DATABASE_URL from the environment (same as the app). "before" replays the
+previous route shape: an async def handler running sync Session queries on the
+event loop. "after" is the current /data route on the async engine. The
+response cache is disabled so every request reaches the database. Requests go
+through httpx's in-process ASGI transport, so both run on one event loop just
+like under uvicorn. Alongside the /data load, GET / (no database access) is
+probed continuously: its p99 shows how long the event loop stalls for every
+other request while a handler blocks on the database. Assets written by the benchmark are tagged with
+source="benchmark" and removed afterwards.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.db import Base, engine, SessionLocal, get_db
+from app.core.models import Asset
+from app.main import app
+
+SOURCE_NAME = "benchmark"
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/")
+async def legacy_root():
+    return {"status": "ok"}
+
+
+@legacy_app.get("/data")
+async def legacy_get_data(page_size: int = 50, source: str = None, db: Session = Depends(get_db)):
+    """The pre-async route: blocking queries inside an async handler."""
+    query = db.query(Asset).filter(Asset.source == source)
+    total = query.count()
+    assets = query.order_by(Asset.updated_at.desc(), Asset.asset_id.desc()).limit(page_size).all()
+    return {"total": total, "data": [asset.symbol for asset in assets]}
+
+
+def seed(db, n: int):
+    db.execute(Asset.__table__.insert(), [
+        {"symbol": f"B{i}", "name": f"Bench {i}", "price_usd": 1.0 + i, "source": SOURCE_NAME}
+        for i in range(n)
+    ])
+    db.commit()
+
+
+def cleanup(db):
+    db.query(Asset).filter(Asset.source == SOURCE_NAME).delete()
+    db.commit()
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, start: float = None) -> float:
+    start = start or time.perf_counter()
+    response = await client.get(url)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+async def load(target, requests: int, concurrency: int) -> Tuple[List[float], List[float]]:
+    """
+    Latencies (ms) of `requests` GETs of /data issued `concurrency` at a time,
+    and of GET / probes sent every millisecond while they run.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    data_latencies, probe_latencies = [], []
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                data_latencies.append(await timed_get(client, f"/data?source={SOURCE_NAME}&page_size=50"))
+
+        async def probe(done: asyncio.Event):
+            while not done.is_set():
+                # Measured from when the probe was due, so time spent waiting for the loop counts
+                due = time.perf_counter() + 0.001
+                await asyncio.sleep(0.001)
+                probe_latencies.append(await timed_get(client, "/", due))
+
+        done = asyncio.Event()
+        prober = asyncio.create_task(probe(done))
+        await asyncio.gather(*(one() for _ in range(requests)))
+        done.set()
+        await prober
+    return data_latencies, probe_latencies
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def report(label: str, data_latencies: list, probe_latencies: list, elapsed: float):
+    print(
+        f"{label:<7} /data p50 {percentile(data_latencies, 50):8.2f} ms  p99 {percentile(data_latencies, 99):8.2f} ms  "
+        f"{len(data_latencies) / elapsed:6.0f} req/s | "
+        f"GET / p50 {percentile(probe_latencies, 50):7.2f} ms  p99 {percentile(probe_latencies, 99):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.DATA_CACHE_ENABLED = False
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, args.assets)
+        print(f"requests: {args.requests} (concurrency {args.concurrency}, {engine.dialect.name})")
+        for label, target in (("before", legacy_app), ("after", app)):
+            start = time.perf_counter()
+            data_latencies, probe_latencies = asyncio.run(load(target, args.requests, args.concurrency))
+            report(label, data_latencies, probe_latencies, time.perf_counter() - start)
+    finally:
+        cleanup(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark GET /data paging depth: OFFSET pages vs keyset cursors.
+
+Usage:
+    python benchmarks/bench_data_pagination.py --assets 200000 --page-size 100
+
+Uses DATABASE_URL from the environment (same as the app). Assets written by
+the benchmark are tagged with source="benchmark" and removed afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from app.core.db import Base, engine, SessionLocal
+from app.core.models import Asset
+from app.main import app
+
+SOURCE_NAME = "benchmark"
+
+
+def seed(db, n: int):
+    now = datetime.utcnow()
+    for start in range(0, n, 10000):
+        db.execute(Asset.__table__.insert(), [
+            {
+                "symbol": f"B{i}",
+                "name": f"Bench {i}",
+                "price_usd": 1.0 + i,
+                "source": SOURCE_NAME,
+                "updated_at": now - timedelta(milliseconds=i),
+            }
+            for i in range(start, min(start + 10000, n))
+        ])
+    db.commit()
+
+
+def timed(client: TestClient, url: str, repeat: int = 5):
+    """Best-of-`repeat` latency in ms and the last response body."""
+    best, body = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = client.get(url).json()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, body
+
+
+def cleanup(db):
+    db.query(Asset).filter(Asset.source == SOURCE_NAME).delete()
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    client = TestClient(app)  # No lifespan: the background ETL loop is not started
+    try:
+        seed(db, args.assets)
+        pages = args.assets // args.page_size
+        print(f"assets: {args.assets} (page size {args.page_size}, {engine.dialect.name})")
+        print(f"{'page':>8} {'offset ms':>10} {'cursor ms':>10}")
+        for depth in (1, pages // 100, pages // 10, pages // 2, pages - 1):
+            depth = max(depth, 1)
+            base = f"/data?source={SOURCE_NAME}&page_size={args.page_size}"
+            offset_ms, _ = timed(client, f"{base}&page={depth}")
+            # The cursor that starts page `depth` is the last row of page depth - 1
+            _, previous = timed(client, f"{base}&page={depth - 1}", repeat=1) if depth > 1 else (0, None)
+            cursor_ms = timed(client, f"{base}&cursor={previous['next_cursor']}")[0] if previous else offset_ms
+            print(f"{depth:>8} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+    finally:
+        cleanup(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark price history writes: per-row add_price_data vs the bulk append path.
+
+Usage:
+    python benchmarks/bench_price_ingest.py --points 20000 --per-row-points 1000
+
+Uses DATABASE_URL from the environment (same as the app). Prices are written
+for a dedicated benchmark coin, which is removed afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import Base, engine, SessionLocal
+from app.core.models import AssetPrice, Coin
+from app.services.normalization import CoinNormalizationService, PricePoint
+
+SOURCE_NAME = "benchmark"
+SYMBOL = "BENCHMARK-COIN"
+
+
+def make_points(coin_id: int, n: int) -> list:
+    """Build synthetic price points for one coin."""
+    return [
+        PricePoint(coin_id=coin_id, source=SOURCE_NAME, price_usd=1.0 + i, market_cap_usd=1000.0 * i)
+        for i in range(n)
+    ]
+
+
+def bench_per_row(db, coin: Coin, points: list) -> float:
+    """Legacy path: add + commit + refresh per price point."""
+    start = time.perf_counter()
+    for point in points:
+        CoinNormalizationService.add_price_data(
+            db, coin, SOURCE_NAME, point.price_usd, market_cap_usd=point.market_cap_usd
+        )
+    return time.perf_counter() - start
+
+
+def bench_bulk(db, points: list, batch_size: int) -> float:
+    """Bulk path: COPY (PostgreSQL) or executemany per batch."""
+    start = time.perf_counter()
+    for i in range(0, len(points), batch_size):
+        CoinNormalizationService.add_price_data_bulk(db, points[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+def cleanup(db, coin_id: int):
+    db.query(AssetPrice).filter(AssetPrice.coin_id == coin_id).delete()
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--per-row-points", type=int, default=1000,
+                        help="points written through the slow per-row path")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        coin = Coin(symbol=SYMBOL, name="Benchmark coin")
+        db.add(coin)
+        db.commit()
+        coin_id = coin.id
+
+        per_row_points = make_points(coin_id, args.per_row_points)
+        per_row = bench_per_row(db, coin, per_row_points)
+        cleanup(db, coin_id)
+
+        points = make_points(coin_id, args.points)
+        bulk = bench_bulk(db, points, args.batch_size)
+        cleanup(db, coin_id)
+
+        db.delete(db.get(Coin, coin_id))
+        db.commit()
+    finally:
+        db.close()
+
+    per_row_rate = args.per_row_points / per_row
+    bulk_rate = args.points / bulk
+    print(f"dialect:  {engine.dialect.name} ({engine.dialect.driver})")
+    print(f"per-row:  {args.per_row_points:7d} points {per_row:8.3f}s  {per_row_rate:10.0f} points/s")
+    print(f"bulk:     {args.points:7d} points {bulk:8.3f}s  {bulk_rate:10.0f} points/s")
+    print(f"speedup:  {bulk_rate / per_row_rate:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
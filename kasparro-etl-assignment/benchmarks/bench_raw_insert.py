@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark raw payload writes: per-record save vs batched multi-row insert.
+
+Usage:
+    python benchmarks/bench_raw_insert.py --records 2500 --batch-size 100
+
+Uses DATABASE_URL from the environment (same as the app). Rows written by the
+benchmark are tagged with source_name="benchmark" and removed afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import Base, engine, SessionLocal
+from app.core.models import RawCoinPaprika
+from app.ingestion.coinpaprika import CoinPaprikaSource
+
+SOURCE_NAME = "benchmark"
+
+
+def make_tickers(n: int) -> list:
+    """Build synthetic CoinPaprika-shaped ticker payloads."""
+    return [
+        {
+            "id": f"coin-{i}",
+            "symbol": f"C{i}",
+            "name": f"Coin {i}",
+            "quotes": {"USD": {"price": 1.0 + i, "market_cap": 1000.0 * i}},
+        }
+        for i in range(n)
+    ]
+
+
+def bench_per_record(db, payloads: list) -> float:
+    """Legacy path: add + commit + refresh per record."""
+    start = time.perf_counter()
+    for payload in payloads:
+        record = RawCoinPaprika(source_name=SOURCE_NAME, payload=payload, fetched_at=datetime.utcnow())
+        db.add(record)
+        db.commit()
+        db.refresh(record)
+    return time.perf_counter() - start
+
+
+def bench_batched(db, payloads: list, batch_size: int) -> float:
+    """Batched path: one multi-row INSERT ... RETURNING per batch."""
+    source = CoinPaprikaSource(db)
+    source.source_name = SOURCE_NAME
+    start = time.perf_counter()
+    for i in range(0, len(payloads), batch_size):
+        source.save_raw_batch(payloads[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+def cleanup(db):
+    db.query(RawCoinPaprika).filter(RawCoinPaprika.source_name == SOURCE_NAME).delete()
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2500)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    payloads = make_tickers(args.records)
+
+    db = SessionLocal()
+    try:
+        per_record = bench_per_record(db, payloads)
+        cleanup(db)
+        batched = bench_batched(db, payloads, args.batch_size)
+        cleanup(db)
+    finally:
+        db.close()
+
+    print(f"records:    {args.records} (batch size {args.batch_size}, {engine.dialect.name})")
+    print(f"per-record: {per_record:8.3f}s  {args.records / per_record:10.0f} records/s")
+    print(f"batched:    {batched:8.3f}s  {args.records / batched:10.0f} records/s")
+    print(f"speedup:    {per_record / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
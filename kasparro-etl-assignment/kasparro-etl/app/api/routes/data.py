@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.core.database.db import SessionLocal
-from app.core.models import Coin, CoinSource, Price
+from app.core.models import Coin, CoinSource, LatestPrice
 
 router = APIRouter()
 
@@ -16,30 +16,28 @@ def get_db():
 
 @router.get("/data")
 def get_data(db: Session = Depends(get_db)):
-    response = []
-
+    # Three queries in total: coins, their sources, and current prices read
+    # from latest_prices instead of sorting each coin's price history
     coins = db.query(Coin).all()
 
-    for coin in coins:
-        sources = (
-            db.query(CoinSource.source)
-            .filter(CoinSource.coin_id == coin.id)
-            .all()
-        )
-        source_list = [s[0] for s in sources]
-
-        latest_price = (
-            db.query(Price)
-            .filter(Price.coin_id == coin.id)
-            .order_by(Price.fetched_at.desc())
-            .first()
-        )
+    sources = {}
+    for coin_id, source in db.query(CoinSource.coin_id, CoinSource.source).all():
+        sources.setdefault(coin_id, []).append(source)
 
+    latest = {}
+    for coin_id, price_usd, fetched_at in db.query(
+        LatestPrice.coin_id, LatestPrice.price_usd, LatestPrice.fetched_at
+    ).all():
+        if coin_id not in latest or latest[coin_id][1] < fetched_at:
+            latest[coin_id] = (price_usd, fetched_at)
+
+    response = []
+    for coin in coins:
         response.append({
             "symbol": coin.symbol,
             "name": coin.name,
-            "sources": source_list,
-            "latest_price_usd": latest_price.price_usd if latest_price else None
+            "sources": sources.get(coin.id, []),
+            "latest_price_usd": latest[coin.id][0] if coin.id in latest else None
         })
 
     return response
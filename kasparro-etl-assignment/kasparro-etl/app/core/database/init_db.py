@@ -1,8 +1,17 @@
-from app.core.database.db import engine
-from app.core.models import Base
+from app.core.database.db import engine, SessionLocal
+from app.core.models import Base, LatestPrice, Price
 
 def init_db():
     Base.metadata.create_all(bind=engine)
 
+    # Backfill latest_prices for databases created before it existed
+    db = SessionLocal()
+    try:
+        if db.query(LatestPrice).first() is None and db.query(Price).first() is not None:
+            from app.ingestion.normalize import rebuild_latest_prices
+            rebuild_latest_prices(db)
+    finally:
+        db.close()
+
 if __name__ == "__main__":
     init_db()
@@ -37,3 +37,13 @@ class Price(Base):
     fetched_at = Column(DateTime, default=datetime.utcnow)
 
     coin = relationship("Coin")
+
+
+class LatestPrice(Base):
+    """Current price per coin per source, upserted alongside every Price row."""
+    __tablename__ = "latest_prices"
+
+    coin_id = Column(Integer, ForeignKey("coins.id"), primary_key=True)
+    source = Column(String, primary_key=True)
+    price_usd = Column(Float)
+    fetched_at = Column(DateTime, nullable=False)
@@ -1,5 +1,8 @@
+from datetime import datetime
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from app.core.models import Coin, CoinSource, Price
+from app.core.models import Coin, CoinSource, LatestPrice, Price
 
 
 def normalize_and_store(
@@ -18,6 +21,7 @@ def normalize_and_store(
     - One coin per symbol (BTC exists once)
     - Multiple sources map to the same coin
     - Prices always link to canonical coin
+    - latest_prices holds the newest price per (coin, source)
     """
 
     # 1. Normalize symbol
@@ -45,9 +49,49 @@ def normalize_and_store(
         db.add(mapping)
 
     # 4. Store price linked to canonical coin
+    fetched_at = datetime.utcnow()
     price = Price(
         coin_id=coin.id,
         source=source,
-        price_usd=price_usd
+        price_usd=price_usd,
+        fetched_at=fetched_at
     )
     db.add(price)
+
+    # 5. Keep the current price in step, in the same transaction
+    stmt = sqlite_insert(LatestPrice).values(
+        coin_id=coin.id,
+        source=source,
+        price_usd=price_usd,
+        fetched_at=fetched_at
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[LatestPrice.coin_id, LatestPrice.source],
+        set_={"price_usd": stmt.excluded.price_usd, "fetched_at": stmt.excluded.fetched_at},
+        where=LatestPrice.fetched_at <= stmt.excluded.fetched_at
+    ))
+
+
+def rebuild_latest_prices(db: Session) -> int:
+    """
+    Consistency repair: recompute latest_prices from the full price history.
+    Returns the number of rows written.
+    """
+    ranked = select(
+        Price.coin_id,
+        Price.source,
+        Price.price_usd,
+        Price.fetched_at,
+        func.row_number().over(
+            partition_by=(Price.coin_id, Price.source),
+            order_by=(Price.fetched_at.desc(), Price.id.desc())
+        ).label("rank")
+    ).subquery()
+    newest = select(ranked.c.coin_id, ranked.c.source, ranked.c.price_usd, ranked.c.fetched_at).where(
+        ranked.c.rank == 1
+    )
+
+    db.query(LatestPrice).delete(synchronize_session=False)
+    db.execute(insert(LatestPrice).from_select(["coin_id", "source", "price_usd", "fetched_at"], newest))
+    db.commit()
+    return db.query(LatestPrice).count()
@@ -2,13 +2,14 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.async_db import get_async_db
 from app.core.db import get_db
 from app.core.models import Asset
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 @pytest.fixture
-def client(test_db):
+def client(test_db, async_test_session_factory):
     """Create test client with test database."""
     def override_get_db():
         try:
@@ -16,7 +17,12 @@ def client(test_db):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with async_test_session_factory() as session:
+            yield session
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
@@ -97,3 +103,142 @@ def test_data_endpoint_filtering(client, test_db):
     assert len(data["data"]) >= 1
     assert all(item["source"] == "coinpaprika" for item in data["data"])
 
+
+
+def test_data_endpoint_cursor_pagination(client, test_db):
+    """Test that following next_cursor walks every row once, in order, ties included."""
+    now = datetime.utcnow()
+    for i in range(12):
+        test_db.add(Asset(
+            symbol=f"TEST{i}",
+            name=f"Test Asset {i}",
+            price_usd=100.0 + i,
+            source="test",
+            updated_at=now - timedelta(seconds=i // 2),  # Pairs share a timestamp
+        ))
+    test_db.commit()
+    
+    first = client.get("/data?page_size=5").json()
+    assert first["total"] == 12
+    seen = [item["asset_id"] for item in first["data"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(f"/data?page_size=5&cursor={cursor}").json()
+        assert page["total"] is None and page["page"] is None
+        seen.extend(item["asset_id"] for item in page["data"])
+        cursor = page["next_cursor"]
+    
+    expected = [
+        asset.asset_id
+        for asset in test_db.query(Asset).order_by(Asset.updated_at.desc(), Asset.asset_id.desc())
+    ]
+    assert seen == expected
+
+
+def test_data_endpoint_rejects_invalid_cursor(client, test_db):
+    """Test that a malformed cursor is a client error."""
+    response = client.get("/data?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_data_endpoint_cache_invalidated_by_data_version(client, test_db):
+    """Test that repeated reads are cached until the ETL data version moves."""
+    from app.services.response_cache import data_version
+    
+    test_db.add(Asset(symbol="BTC", name="Bitcoin", price_usd=50000.0, source="coinpaprika"))
+    test_db.commit()
+    
+    first = client.get("/data?symbol=btc")
+    assert first.headers["X-Cache"] == "MISS"
+    second = client.get("/data?symbol=BTC")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["data"] == first.json()["data"]
+    assert second.json()["request_id"] != first.json()["request_id"]
+    
+    test_db.query(Asset).update({Asset.price_usd: 51000.0})
+    test_db.commit()
+    data_version.bump()
+    
+    third = client.get("/data?symbol=BTC")
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.json()["data"][0]["price_usd"] == 51000.0
+
+
+def test_data_endpoint_matches_response_schema(client, test_db):
+    """Test that the fast /data body is exactly what AssetListResponse would serialize."""
+    from app.schemas.unified import AssetListResponse
+    
+    test_db.add(Asset(symbol="BTC", name="Bitcoin", price_usd=50000.5, volume_24h=1e10, source="coinpaprika"))
+    test_db.add(Asset(symbol="ETH", name="Éther", price_usd=None, market_cap=None, source="coingecko"))
+    test_db.commit()
+    
+    response = client.get("/data?page_size=1")
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["next_cursor"] is not None
+    assert AssetListResponse.model_validate(body).model_dump(mode="json") == body
+
+
+def test_dump_asset_list_matches_pydantic():
+    """Test that the orjson encoder produces pydantic's bytes for edge-case values."""
+    from datetime import timezone
+    from app.api.routes import dump_asset_list
+    from app.schemas.unified import AssetListResponse
+    
+    rows = [
+        {"symbol": "BTC", "name": "Bitcoin", "price_usd": 1e-9, "market_cap": None, "volume_24h": float("nan"),
+         "source": "a", "asset_id": 1, "updated_at": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+        {"symbol": "E", "name": "Éther ✓", "price_usd": 0.1 + 0.2, "market_cap": 1e300, "volume_24h": 3.0,
+         "source": "b", "asset_id": 2, "updated_at": datetime(2024, 1, 1, 1, 2, 3, 4500, tzinfo=timezone(timedelta(hours=5)))},
+        {"symbol": "N", "name": "n", "price_usd": 2.0, "market_cap": 1.5, "volume_24h": None,
+         "source": "c", "asset_id": 3, "updated_at": datetime(2024, 1, 1, 1, 2, 3, 999999)},
+    ]
+    body = {"request_id": "r", "api_latency_ms": 1.5, "data": rows, "total": 3, "page": 1, "page_size": 50, "next_cursor": None}
+    assert dump_asset_list(body) == AssetListResponse(**body).model_dump_json().encode("utf-8")
+
+
+def test_data_endpoint_symbol_match_modes(client, test_db):
+    """Test exact, prefix and substring symbol matching."""
+    for symbol in ("BTC", "BTCB", "WBTC", "ETH"):
+        test_db.add(Asset(symbol=symbol, name=symbol, price_usd=1.0, source="test"))
+    test_db.commit()
+    
+    def symbols(query):
+        return sorted(item["symbol"] for item in client.get(f"/data?{query}").json()["data"])
+    
+    assert symbols("symbol=btc&match=exact") == ["BTC"]
+    assert symbols("symbol=btc&match=prefix") == ["BTC", "BTCB"]
+    assert symbols("symbol=btc") == ["BTC", "BTCB", "WBTC"]
+    assert symbols("symbol=B_C&match=contains") == []  # LIKE wildcards are matched literally
+
+
+def test_symbol_autocomplete(client, test_db):
+    """Test prefix completion from the in-memory sorted symbol list."""
+    for symbol, source in (("BTC", "a"), ("BTC", "b"), ("BTCB", "a"), ("BCH", "a"), ("ETH", "a")):
+        test_db.add(Asset(symbol=symbol, name=f"{symbol} coin", price_usd=1.0, source=source))
+    test_db.commit()
+    
+    response = client.get("/symbols/autocomplete?q=bt")
+    assert response.status_code == 200
+    assert [item["symbol"] for item in response.json()["data"]] == ["BTC", "BTCB"]
+    assert [item["symbol"] for item in client.get("/symbols/autocomplete?q=b&limit=2").json()["data"]] == ["BCH", "BTC"]
+
+
+def test_symbol_autocomplete_reloads_after_ttl(test_db, monkeypatch):
+    """Test that symbols written outside the ETL show up once the list expires."""
+    import time
+    from app.services import symbol_search
+    
+    autocomplete = symbol_search.SymbolAutocomplete(ttl_seconds=30.0)
+    test_db.add(Asset(symbol="BTC", name="Bitcoin", price_usd=1.0, source="a"))
+    test_db.commit()
+    assert [match.symbol for match in autocomplete.complete(test_db, "b")] == ["BTC"]
+    
+    # Written by another process: the data version does not move
+    test_db.add(Asset(symbol="BCH", name="Bitcoin Cash", price_usd=1.0, source="a"))
+    test_db.commit()
+    assert [match.symbol for match in autocomplete.complete(test_db, "b")] == ["BTC"]
+    
+    now = time.monotonic()
+    monkeypatch.setattr(symbol_search.time, "monotonic", lambda: now + 31)
+    assert [match.symbol for match in autocomplete.complete(test_db, "b")] == ["BCH", "BTC"]
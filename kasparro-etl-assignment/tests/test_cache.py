@@ -0,0 +1,54 @@
+"""Tests for the in-process LRU and coin identity caches."""
+from sqlalchemy import event
+from app.core.cache import LRUCache
+from app.core.models import CoinSourceMapping
+from app.services.identity_cache import coin_identity_cache
+from app.services.normalization import CoinNormalizationService
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test bounded eviction order and hit/miss counters."""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.snapshot()["hits"] == 2
+    assert cache.snapshot()["misses"] == 1
+
+
+def test_lru_cache_expires_entries_after_ttl(monkeypatch):
+    """Test that entries older than the TTL count as misses."""
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=10, ttl_seconds=5)
+    cache.put("a", 1)
+    
+    now[0] += 6
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_get_or_create_coin_repeat_lookup_issues_no_sql(test_db):
+    """Test that a cached mapping is returned without SQL and last_seen is flushed in bulk."""
+    coin = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coinpaprika", source_id="btc-bitcoin"
+    )
+    coin_id = coin.id
+    
+    statements = []
+    event.listen(test_db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    again = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coinpaprika", source_id="btc-bitcoin"
+    )
+    
+    assert again.id == coin_id
+    assert statements == []
+    assert coin_identity_cache.snapshot()["pending_last_seen"] == 1
+    
+    assert coin_identity_cache.flush_last_seen(test_db) == 1
+    assert test_db.query(CoinSourceMapping).count() == 1
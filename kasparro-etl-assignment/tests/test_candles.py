@@ -0,0 +1,84 @@
+"""Tests for incremental OHLC price rollups."""
+from datetime import datetime, timedelta
+from app.core.models import PriceCandle
+from app.services.candles import aggregate_points, choose_resolution, get_candles, rebuild_candles
+from app.services.normalization import CoinNormalizationService, PricePoint
+
+
+def test_aggregate_points_orders_ticks_by_fetch_time():
+    """Test that open/close follow fetched_at even when ticks arrive out of order."""
+    base = datetime(2026, 1, 1, 12, 0, 10)
+    candles = aggregate_points([
+        PricePoint(1, "coingecko", 101.0, volume_24h_usd=5.0, fetched_at=base + timedelta(seconds=20)),
+        PricePoint(1, "coingecko", 100.0, volume_24h_usd=4.0, fetched_at=base),
+        PricePoint(1, "coingecko", 99.0, volume_24h_usd=6.0, fetched_at=base + timedelta(seconds=10)),
+    ])
+    
+    minute = candles[(1, "coingecko", "1m", datetime(2026, 1, 1, 12, 0))]
+    assert (minute["open_usd"], minute["high_usd"], minute["low_usd"], minute["close_usd"]) == (100.0, 101.0, 99.0, 101.0)
+    assert minute["volume_24h_usd"] == 5.0
+    assert minute["tick_count"] == 3
+    assert len(candles) == 3  # One bucket per resolution
+
+
+def test_choose_resolution_fits_max_points():
+    """Test that the finest resolution within CANDLE_MAX_POINTS is picked."""
+    start = datetime(2026, 1, 1)
+    assert choose_resolution(start, start + timedelta(hours=6)) == "1m"
+    assert choose_resolution(start, start + timedelta(days=30)) == "1h"
+    assert choose_resolution(start, start + timedelta(days=365)) == "1d"
+
+
+def test_candles_update_incrementally_with_ingest(test_db):
+    """Test that each batch only merges into the buckets it touches, matching a full rebuild."""
+    coin = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coingecko", source_id="bitcoin"
+    )
+    base = datetime(2026, 1, 1, 12, 0)
+    CoinNormalizationService.add_price_data_bulk(test_db, [
+        PricePoint(coin.id, "coingecko", 100.0, fetched_at=base + timedelta(seconds=5)),
+        PricePoint(coin.id, "coingecko", 105.0, fetched_at=base + timedelta(seconds=30)),
+    ])
+    CoinNormalizationService.add_price_data_bulk(test_db, [
+        PricePoint(coin.id, "coingecko", 98.0, fetched_at=base + timedelta(seconds=1)),  # Late, earlier tick
+        PricePoint(coin.id, "coingecko", 103.0, fetched_at=base + timedelta(minutes=1, seconds=5)),
+    ])
+    
+    def series(resolution):
+        _, candles = get_candles(test_db, coin.id, "coingecko", base, base + timedelta(hours=1), resolution)
+        return [(c.open_usd, c.high_usd, c.low_usd, c.close_usd, c.tick_count) for c in candles]
+    
+    incremental = {resolution: series(resolution) for resolution in ("1m", "1h")}
+    assert incremental["1m"] == [(98.0, 105.0, 98.0, 105.0, 3), (103.0, 103.0, 103.0, 103.0, 1)]
+    assert incremental["1h"] == [(98.0, 105.0, 98.0, 103.0, 4)]
+    assert test_db.query(PriceCandle).count() == 4
+    
+    assert rebuild_candles(test_db) == 4
+    assert {resolution: series(resolution) for resolution in ("1m", "1h")} == incremental
+
+
+def test_candles_endpoint_accepts_aware_start_without_end(test_db):
+    """Test that a Z-suffixed start is compared with the default (naive UTC) end."""
+    from fastapi.testclient import TestClient
+    from app.core.db import get_db
+    from app.main import app
+    
+    coin = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coingecko", source_id="bitcoin"
+    )
+    now = datetime.utcnow()
+    CoinNormalizationService.add_price_data_bulk(test_db, [
+        PricePoint(coin.id, "coingecko", 100.0, fetched_at=now - timedelta(minutes=5)),
+    ])
+    
+    app.dependency_overrides[get_db] = lambda: test_db
+    try:
+        start = (now - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        response = TestClient(app).get(f"/candles?symbol=BTC&start={start}")
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["interval"] == "1m"
+    assert [candle["close_usd"] for candle in body["data"]] == [100.0]
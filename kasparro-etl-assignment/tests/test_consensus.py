@@ -0,0 +1,70 @@
+"""Tests for cross-source consensus prices."""
+import numpy as np
+from app.core.models import Asset, ConsensusPrice
+from app.services.consensus import compute_consensus, run_consensus
+
+
+def test_compute_consensus_groups_all_symbols_at_once():
+    """Test median, volume-weighted price, range and spread per symbol."""
+    result = compute_consensus(
+        symbols=["ETH", "BTC", "BTC", "ETH", "BTC", "DOGE"],
+        prices=[2000.0, 100.0, 110.0, 2100.0, 120.0, 0.1],
+        volumes=[1.0, 3.0, 1.0, 3.0, None, None],
+    )
+    by_symbol = {symbol: i for i, symbol in enumerate(result.symbols.tolist())}
+    
+    btc, eth, doge = by_symbol["BTC"], by_symbol["ETH"], by_symbol["DOGE"]
+    assert result.source_count[btc] == 3
+    assert result.median[btc] == 110.0
+    assert result.median[eth] == 2050.0  # Even count: mean of the middle pair
+    assert np.isclose(result.vwap[btc], (100.0 * 3 + 110.0 * 1) / 4)
+    assert np.isclose(result.vwap[eth], (2000.0 * 1 + 2100.0 * 3) / 4)
+    assert result.vwap[doge] == result.median[doge] == 0.1  # No volume: falls back to median
+    assert (result.low[btc], result.high[btc]) == (100.0, 120.0)
+    assert np.isclose(result.spread_pct[btc], 20.0 / 110.0 * 100)
+    assert result.spread_pct[doge] == 0.0
+
+
+def test_compute_consensus_ignores_missing_prices():
+    """Test that missing or non-positive prices are not counted as quotes."""
+    result = compute_consensus(["BTC", "BTC", "BTC"], [100.0, float("nan"), 0.0], [1.0, 1.0, 1.0])
+    
+    assert result.symbols.tolist() == ["BTC"]
+    assert result.source_count.tolist() == [1]
+    assert result.median.tolist() == [100.0]
+
+
+def test_run_consensus_merges_aliases_across_sources(test_db):
+    """Test that the consensus table is rebuilt from assets with canonical symbols."""
+    test_db.add_all([
+        Asset(symbol="BTC", name="Bitcoin", price_usd=100.0, volume_24h=10.0, source="coinpaprika"),
+        Asset(symbol="XBT", name="Bitcoin", price_usd=104.0, volume_24h=30.0, source="coingecko"),
+        Asset(symbol="ETH", name="Ethereum", price_usd=2000.0, source="csv_source"),
+    ])
+    test_db.commit()
+    
+    assert run_consensus(test_db) == {"symbols": 2, "quotes": 3}
+    
+    btc = test_db.query(ConsensusPrice).filter_by(symbol="BTC").one()
+    assert btc.source_count == 2
+    assert btc.median_price_usd == 102.0
+    assert btc.vwap_price_usd == 103.0
+    assert btc.total_volume_24h == 40.0
+    assert test_db.query(ConsensusPrice).filter_by(symbol="ETH").one().total_volume_24h is None
+
+
+def test_run_consensus_counts_sources_not_aliased_quotes(test_db):
+    """Test that two aliases quoted by one source count, and weigh, as that source once."""
+    test_db.add_all([
+        Asset(symbol="BTC", name="Bitcoin", price_usd=100.0, volume_24h=10.0, source="coinpaprika"),
+        Asset(symbol="XBT", name="Bitcoin", price_usd=90.0, volume_24h=1.0, source="coinpaprika"),
+        Asset(symbol="BTC", name="Bitcoin", price_usd=104.0, volume_24h=30.0, source="coingecko"),
+    ])
+    test_db.commit()
+    
+    run_consensus(test_db)
+    
+    btc = test_db.query(ConsensusPrice).filter_by(symbol="BTC").one()
+    assert btc.source_count == 2
+    assert (btc.min_price_usd, btc.median_price_usd) == (100.0, 102.0)  # The thinner XBT quote is dropped
+    assert btc.total_volume_24h == 40.0
@@ -1,10 +1,11 @@
 """Tests for ETL functionality."""
 import pytest
-from app.core.models import Asset, ETLCheckpoint, RawCoinPaprika
+from app.core.models import Asset, ETLCheckpoint, RawCoinPaprika, RawRecordHash
 from app.services.etl_runner import ETLRunner
 from app.services.checkpoint import CheckpointService
 from app.ingestion.coinpaprika import CoinPaprikaSource
 import os
+from datetime import datetime
 
 
 def test_etl_transforms_valid_data(test_db):
@@ -107,3 +108,211 @@ def test_checkpoint_resume(test_db):
     checkpoint = checkpoint_service.get_checkpoint("test_source")
     assert checkpoint.last_processed_id == 100
 
+
+
+def test_save_raw_batch_returns_ids_in_order(test_db):
+    """Test that batched raw inserts return one ID per payload, in order."""
+    source = CoinPaprikaSource(test_db)
+    payloads = [{"id": f"coin-{i}", "symbol": f"C{i}"} for i in range(5)]
+    
+    ids = source.save_raw_batch(payloads)
+    
+    assert len(ids) == 5
+    assert ids == sorted(ids)
+    for raw_id, payload in zip(ids, payloads):
+        assert test_db.get(RawCoinPaprika, raw_id).payload == payload
+
+
+def test_save_raw_batch_extracts_indexed_key_columns(test_db):
+    """Test that source id, symbol and source timestamp are stored beside the payload."""
+    source = CoinPaprikaSource(test_db)
+    source.save_raw_batch([
+        {"id": "btc-bitcoin", "symbol": "btc", "last_updated": "2026-01-01T12:00:00Z"},
+        {"id": "eth-ethereum", "symbol": "ETH", "last_updated": "not a date"},
+        {"id": "btc-bitcoin", "symbol": "btc", "last_updated": "2026-01-01T12:05:00Z"},
+    ])
+    
+    rows = source.find_raw(symbol="btc")
+    assert [row.source_record_id for row in rows] == ["btc-bitcoin", "btc-bitcoin"]
+    assert rows[0].source_timestamp.replace(tzinfo=None) == datetime(2026, 1, 1, 12, 5)
+    eth = source.find_raw(source_record_id="eth-ethereum", limit=1)[0]
+    assert (eth.symbol, eth.source_timestamp) == ("ETH", None)
+
+
+def test_filter_unchanged_skips_previously_processed_payloads(test_db):
+    """Test that only new or changed payloads survive the content-hash filter."""
+    source = CoinPaprikaSource(test_db)
+    first = [{"id": "btc-bitcoin", "price": 1.0}, {"id": "eth-ethereum", "price": 2.0}]
+    batch, hashes = source.filter_unchanged(first)
+    ids = source.save_raw_batch(batch, hashes)
+    source.remember_hashes(batch, hashes, ids)
+    
+    second = [
+        {"price": 1.0, "id": "btc-bitcoin"},  # same content, different key order
+        {"id": "eth-ethereum", "price": 2.5},
+        {"id": "eth-ethereum", "price": 2.5},  # duplicate within the batch
+    ]
+    batch, hashes = source.filter_unchanged(second)
+    
+    assert batch == [{"id": "eth-ethereum", "price": 2.5}]
+    assert source.stats["skipped_unchanged"] == 2
+    assert test_db.query(RawRecordHash).count() == 2
+
+
+def test_save_unified_batch_upserts_on_symbol_source(test_db):
+    """Test that batch upserts update existing rows instead of re-inserting."""
+    source = CoinPaprikaSource(test_db)
+    batch = [
+        {"symbol": "BTC", "name": "Bitcoin", "price_usd": 50000.0, "market_cap": None, "source": "coinpaprika"},
+        {"symbol": "ETH", "name": "Ethereum", "price_usd": 3000.0, "market_cap": None, "source": "coinpaprika"},
+    ]
+    assert source.save_unified_batch(batch) == 2
+    
+    batch[0]["price_usd"] = 51000.0
+    assert source.save_unified_batch(batch) == 2
+    
+    test_db.expire_all()
+    assert test_db.query(Asset).count() == 2
+    btc = test_db.query(Asset).filter(Asset.symbol == "BTC").one()
+    assert btc.price_usd == 51000.0
+
+
+def test_save_unified_batch_skips_unchanged_rows(test_db):
+    """Test that identical values do not rewrite the row or bump updated_at."""
+    source = CoinPaprikaSource(test_db)
+    batch = [
+        {"symbol": "BTC", "name": "Bitcoin", "price_usd": 50000.0, "market_cap": None, "source": "coinpaprika"},
+        {"symbol": "ETH", "name": "Ethereum", "price_usd": 3000.0, "market_cap": None, "source": "coinpaprika"},
+    ]
+    source.save_unified_batch(batch)
+    btc_updated_at = test_db.query(Asset.updated_at).filter(Asset.symbol == "BTC").scalar()
+    source.stats.clear()
+    
+    batch[1]["price_usd"] = 3100.0
+    source.save_unified_batch(batch)
+    
+    assert source.stats["unified_changed"] == 1
+    assert source.stats["unified_unchanged"] == 1
+    test_db.expire_all()
+    assert test_db.query(Asset.updated_at).filter(Asset.symbol == "BTC").scalar() == btc_updated_at
+
+
+def test_csv_source_resumes_from_byte_offset(tmp_path):
+    """Test that the streaming CSV reader resumes by seeking to the saved position."""
+    from app.ingestion.csv_source import CSVSource
+    
+    csv_file = tmp_path / "assets.csv"
+    csv_file.write_text(
+        'symbol,name,price\n'
+        'BTC,"Bitcoin\nCore",50000\n'
+        'ETH,Ethereum,3000\n'
+        'SOL,Solana,100\n'
+    )
+    
+    first = CSVSource(None, csv_path=str(csv_file))
+    batches = first.iter_batches(batch_size=2)
+    assert [row["symbol"] for row in next(batches)] == ["BTC", "ETH"]
+    offset, row_number, fingerprint = first.position
+    assert row_number == 2
+    
+    resumed = CSVSource(None, csv_path=str(csv_file))
+    rows = [row for batch in resumed.iter_batches(batch_size=2, position=first.position) for row in batch]
+    assert [row["symbol"] for row in rows] == ["SOL"]
+    assert resumed.position == (csv_file.stat().st_size, 3, fingerprint)
+
+
+def test_csv_checkpoint_restarts_when_file_is_replaced(test_db, tmp_path):
+    """Test that a saved offset is not applied to a different file at the same path."""
+    csv_file = tmp_path / "assets.csv"
+    csv_file.write_text('symbol,name,price\nBTC,Bitcoin,1\nETH,Ether,2\n')
+    runner = ETLRunner(test_db)
+    runner.sources["csv_source"].csv_path = str(csv_file)
+    
+    assert runner.run_source("csv_source")["records_processed"] == 2
+    offset = runner.checkpoint_service.get_position("csv_source")[0]
+    
+    # Same path and inode, and the old offset still lands on a line start
+    replacement = 'symbol,name,price\nSOL,Solanaa,3\nADA,Cardo,4\nXRP,Ripple,5\n'
+    assert replacement.encode()[offset - 1:offset] == b"\n"
+    csv_file.write_text(replacement)
+    
+    assert runner.run_source("csv_source")["records_processed"] == 3
+    symbols = {symbol for (symbol,) in test_db.query(Asset.symbol).filter(Asset.source == "csv_source")}
+    assert symbols == {"BTC", "ETH", "SOL", "ADA", "XRP"}
+
+
+def test_csv_normalize_batch_resolves_header_and_nulls_bad_cells():
+    """Test column-wise CSV normalization with alternate spellings and bad cells."""
+    from app.ingestion.csv_source import CSVSource
+    
+    source = CSVSource(None)
+    rows = [
+        {"Symbol": "btc", "Name": "Bitcoin", "Price": "50000.5", "priceUSD": "1", "MarketCap": ""},
+        {"Symbol": "eth", "Name": "Ethereum", "Price": "n/a", "priceUSD": "3000", "MarketCap": "bad"},
+    ]
+    
+    normalized = source.normalize_batch(rows)
+    
+    assert normalized[0]["symbol"] == "BTC"
+    assert normalized[0]["price_usd"] == 50000.5
+    assert normalized[0]["market_cap"] is None
+    assert normalized[1]["price_usd"] == 3000.0  # falls through to the next spelling
+    assert normalized[1]["market_cap"] is None
+    assert normalized == [source.normalize(row) for row in rows]
+
+
+def test_run_all_records_price_history_and_candles(test_db, monkeypatch):
+    """Test that ETL batches feed price history, latest prices and candles."""
+    from app.core.models import AssetPrice, Coin, LatestPrice, PriceCandle
+    from app.ingestion.coingecko import CoinGeckoSource
+    from app.ingestion.csv_source import CSVSource
+    
+    records = [
+        {"id": "btc-bitcoin", "symbol": "BTC", "name": "Bitcoin", "quotes": {"USD": {"price": 50000.0, "volume_24h": 1e9}}},
+        {"id": "eth-ethereum", "symbol": "ETH", "name": "Ethereum", "quotes": {"USD": {"price": 3000.0}}},
+        {"id": "no-price", "symbol": "NOP", "name": "No Price", "quotes": {}},
+    ]
+    
+    def one_batch(self, last_processed_id=None, batch_size=None, position=None):
+        return iter([records])
+    
+    def no_batches(self, last_processed_id=None, batch_size=None, position=None):
+        return iter([])
+    
+    monkeypatch.setattr(CoinPaprikaSource, "iter_batches", one_batch)
+    monkeypatch.setattr(CoinGeckoSource, "iter_batches", no_batches)
+    monkeypatch.setattr(CSVSource, "iter_batches", no_batches)
+    
+    result = ETLRunner(test_db).run_all(concurrent=False)
+    
+    assert result["sources"]["coinpaprika"]["status"] == "completed"
+    assert test_db.query(Asset).count() == 3
+    assert test_db.query(AssetPrice).count() == 2
+    assert test_db.query(LatestPrice).count() == 2
+    btc = test_db.query(Coin).filter(Coin.symbol == "BTC").one()
+    candle = test_db.query(PriceCandle).filter(
+        PriceCandle.coin_id == btc.id, PriceCandle.resolution == "1m"
+    ).one()
+    assert (candle.source, candle.close_usd, candle.volume_24h_usd, candle.tick_count) == ("coinpaprika", 50000.0, 1e9, 1)
+
+
+def test_failed_records_are_not_remembered_as_unchanged(test_db, monkeypatch):
+    """Test that a record that failed normalization is retried by the next run."""
+    records = [
+        {"id": "btc-bitcoin", "symbol": "BTC", "name": "Bitcoin", "quotes": {"USD": {"price": 50000.0}}},
+        {"id": "bad-coin", "symbol": "BAD", "name": "Bad", "quotes": "not a quote map"},
+    ]
+    
+    def one_batch(self, last_processed_id=None, batch_size=None, position=None):
+        return iter([records])
+    
+    monkeypatch.setattr(CoinPaprikaSource, "iter_batches", one_batch)
+    runner = ETLRunner(test_db)
+    
+    first = runner.run_source("coinpaprika")
+    assert (first["records_processed"], first["records_failed"]) == (1, 1)
+    assert [row.record_key for row in test_db.query(RawRecordHash).all()] == ["btc-bitcoin"]
+    
+    second = runner.run_source("coinpaprika")
+    assert second["records_skipped_unchanged"] == 1
+    assert second["records_failed"] == 1
@@ -34,3 +34,32 @@ def test_failure_mid_etl_resume_works(test_db):
     # Clean up
     os.environ.pop("FAIL_AFTER_N_RECORDS", None)
 
+
+
+def test_concurrent_run_all_isolates_source_failures(test_db, monkeypatch):
+    """Test that one failing source does not affect the others in concurrent mode."""
+    from sqlalchemy.orm import sessionmaker
+    from app.ingestion.coinpaprika import CoinPaprikaSource
+    from app.ingestion.coingecko import CoinGeckoSource
+    from app.ingestion.csv_source import CSVSource
+    
+    def broken_batches(self, last_processed_id=None, batch_size=None, position=None):
+        raise RuntimeError("source down")
+    
+    def no_batches(self, last_processed_id=None, batch_size=None, position=None):
+        return iter([])
+    
+    monkeypatch.setattr(CoinPaprikaSource, "iter_batches", broken_batches)
+    monkeypatch.setattr(CoinGeckoSource, "iter_batches", no_batches)
+    monkeypatch.setattr(CSVSource, "iter_batches", no_batches)
+    
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=test_db.get_bind())
+    result = ETLRunner(test_db, session_factory=session_factory).run_all(concurrent=True, max_workers=2)
+    
+    assert result["mode"] == "concurrent"
+    assert result["sources"]["coinpaprika"]["status"] == "failed"
+    assert result["sources"]["coingecko"]["status"] == "completed"
+    assert result["sources"]["csv_source"]["status"] == "completed"
+    assert set(result["source_durations"]) == {"coinpaprika", "coingecko", "csv_source"}
+    # Failed results carry the same counters as completed ones
+    assert set(result["sources"]["coinpaprika"]) == set(result["sources"]["coingecko"]) | {"error"}
@@ -0,0 +1,173 @@
+"""Tests for the shared pooled HTTP client against a local stub server."""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from app.core.http import HTTPClientPool, RateLimiter, ValidatorCache, http_pool
+from app.ingestion.coingecko import CoinGeckoSource
+from app.ingestion.coinpaprika import CoinPaprikaSource
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive JSON server mimicking the CoinGecko markets endpoint."""
+    protocol_version = "HTTP/1.1"
+    failing_pages = frozenset()
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+        if page in self.failing_pages:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps([{"id": f"coin-{page}", "symbol": "btc", "name": "Bitcoin", "current_price": 50000.0}]).encode()
+        etag = f'"page-{page}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Run the stub server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_client_reuses_connections(stub_server):
+    """Test that repeated requests share one keep-alive connection and are timed."""
+    pool = HTTPClientPool()
+    try:
+        for _ in range(3):
+            response = pool.sync_client.get(f"{stub_server}/coins/markets")
+            assert response.status_code == 200
+    finally:
+        pool.close()
+
+    metrics = pool.metrics.snapshot()
+    assert metrics["requests"] == 3
+    assert metrics["connections_opened"] == 1
+    assert metrics["connections_reused"] == 2
+    assert metrics["connect_seconds"] >= 0
+    assert metrics["transfer_seconds"] > 0
+
+
+def test_async_client_reuses_connections(stub_server):
+    """Test the async client against the same stub server."""
+    pool = HTTPClientPool()
+
+    async def fetch_all():
+        try:
+            for _ in range(3):
+                response = await pool.async_client.get(f"{stub_server}/coins/markets")
+                assert response.status_code == 200
+        finally:
+            await pool.aclose()
+
+    asyncio.run(fetch_all())
+
+    metrics = pool.metrics.snapshot()
+    assert metrics["requests"] == 3
+    assert metrics["connections_opened"] == 1
+
+
+def test_source_uses_injected_client(stub_server):
+    """Test that API sources fetch through the injected pooled client."""
+    pool = HTTPClientPool()
+    try:
+        source = CoinGeckoSource(db=None, http_client=pool.sync_client)
+        source.BASE_URL = stub_server
+        data = source.fetch_data()
+    finally:
+        pool.close()
+
+    assert data[0]["id"] == "coin-1"
+    assert pool.metrics.snapshot()["requests"] == 1
+
+
+def test_coingecko_fetches_pages_concurrently(stub_server, monkeypatch):
+    """Test that deep pagination streams every configured page once."""
+    pool = HTTPClientPool()
+    try:
+        source = CoinGeckoSource(db=None, http_client=pool.sync_client)
+        source.BASE_URL = stub_server
+        source.pages = 5
+        source.max_concurrency = 3
+        monkeypatch.setattr(source, "rate_limiter", RateLimiter(6000, burst=5))
+        batches = list(source.iter_batches(batch_size=100))
+    finally:
+        pool.close()
+
+    assert sorted(batch[0]["id"] for batch in batches) == [f"coin-{page}" for page in range(1, 6)]
+
+
+def test_coingecko_failed_page_fails_after_remaining_pages(stub_server, monkeypatch):
+    """Test that one failed page still streams the others, then fails the fetch."""
+    monkeypatch.setattr(StubHandler, "failing_pages", frozenset({3}))
+    pool = HTTPClientPool()
+    ids = []
+    try:
+        source = CoinGeckoSource(db=None, http_client=pool.sync_client)
+        source.BASE_URL = stub_server
+        source.pages = 5
+        monkeypatch.setattr(source, "rate_limiter", RateLimiter(6000, burst=5))
+        with pytest.raises(RuntimeError, match="1 of 5 CoinGecko pages failed"):
+            for batch in source.iter_batches(batch_size=100):
+                ids.extend(record["id"] for record in batch)
+    finally:
+        pool.close()
+
+    assert sorted(ids) == ["coin-1", "coin-2", "coin-4", "coin-5"]
+    assert source.stats["failed_pages"] == 1
+
+
+def test_coinpaprika_streams_tickers(stub_server):
+    """Test that CoinPaprika parses the streamed /tickers body into batches."""
+    pool = HTTPClientPool()
+    try:
+        source = CoinPaprikaSource(db=None, http_client=pool.sync_client)
+        source.BASE_URL = stub_server
+        batches = list(source.iter_batches(batch_size=10))
+    finally:
+        pool.close()
+
+    assert [[record["id"] for record in batch] for batch in batches] == [["coin-1"]]
+
+
+def test_coinpaprika_conditional_fetch_skips_unchanged_body(stub_server, monkeypatch):
+    """Test that validators from a completed run turn the next fetch into a 304."""
+    monkeypatch.setattr(http_pool, "validators", ValidatorCache())
+    pool = HTTPClientPool()
+    try:
+        source = CoinPaprikaSource(db=None, http_client=pool.sync_client)
+        source.BASE_URL = stub_server
+        assert len(list(source.iter_batches(batch_size=10))) == 1
+        
+        # Validators are only remembered once the run completes
+        assert len(list(source.iter_batches(batch_size=10))) == 1
+        source.finalize_run()
+        
+        source.reset_run_state()
+        assert list(source.iter_batches(batch_size=10)) == []
+    finally:
+        pool.close()
+
+    assert source.stats["not_modified"] == 1
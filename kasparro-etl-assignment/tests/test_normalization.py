@@ -0,0 +1,130 @@
+"""Tests for symbol aliases, canonical coin resolution and price history writes."""
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.core.models import AssetPrice, Coin, CoinSourceMapping, LatestPrice, SymbolAlias
+from app.services.identity_cache import coin_identity_cache
+from app.services.latest_prices import rebuild_latest_prices, verify_latest_prices
+from app.services.normalization import CoinNormalizationService, CoinRef, PricePoint
+from app.services.symbol_resolver import SymbolIndex, SymbolResolver
+
+
+def test_symbol_index_collapses_alias_chains():
+    """Test O(1) alias resolution with chains, cycles and batch lookups."""
+    index = SymbolIndex([("XBT", "BITCOIN"), ("BITCOIN", "BTC"), ("A", "B"), ("B", "A")])
+    
+    assert index.resolve(" xbt ") == "BTC"
+    assert index.resolve("a") == "A"  # cyclic rules are ignored
+    assert index.resolve_many(["bitcoin", "eth", "XBT"]) == ["BTC", "ETH", "BTC"]
+
+
+def test_symbol_resolver_hot_reloads_alias_table(test_db):
+    """Test that alias table edits are picked up by reload_if_changed."""
+    resolver = SymbolResolver()
+    resolver.reload(test_db)
+    assert resolver.resolve("WBTC") == "WBTC"
+    assert resolver.reload_if_changed(test_db) is False
+    
+    test_db.add(SymbolAlias(alias="WBTC", canonical="BTC"))
+    test_db.commit()
+    
+    assert resolver.reload_if_changed(test_db) is True
+    assert resolver.resolve("wbtc") == "BTC"
+    assert resolver.resolve("XBT") == "BTC"  # built-in defaults still apply
+
+
+def test_symbol_resolver_sees_raw_sql_alias_edits(test_db):
+    """Test that an UPDATE leaving row count and updated_at alone still triggers a reload."""
+    from sqlalchemy import text
+    
+    test_db.add(SymbolAlias(alias="WBTC", canonical="BTC"))
+    test_db.commit()
+    resolver = SymbolResolver()
+    resolver.reload(test_db)
+    assert resolver.resolve("WBTC") == "BTC"
+    
+    test_db.execute(text("UPDATE symbol_aliases SET canonical = 'WBTC' WHERE alias = 'WBTC'"))
+    test_db.commit()
+    
+    assert resolver.reload_if_changed(test_db) is True
+    assert resolver.resolve("WBTC") == "WBTC"
+    assert resolver.reload_if_changed(test_db) is False
+
+
+def test_resolve_batch_uses_constant_queries_and_merges_aliases(test_db):
+    """Test batch resolution of new, existing and aliased coins."""
+    existing = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="ETH", name="Ethereum", source="coinpaprika", source_id="eth-ethereum"
+    )
+    existing_id = existing.id
+    coin_identity_cache.clear()
+    
+    refs = [
+        CoinRef("coinpaprika", "eth-ethereum", "ETH", "Ethereum"),
+        CoinRef("coingecko", "bitcoin", "BTC", "Bitcoin"),
+        CoinRef("coinpaprika", "btc-bitcoin", "XBT", "Bitcoin"),
+    ] + [CoinRef("coingecko", f"coin-{i}", f"C{i}", f"Coin {i}") for i in range(50)]
+    
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        coin_ids = CoinNormalizationService.resolve_batch(test_db, refs)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+    
+    assert len(statements) <= 6
+    assert coin_ids[("coinpaprika", "eth-ethereum")] == existing_id
+    assert coin_ids[("coingecko", "bitcoin")] == coin_ids[("coinpaprika", "btc-bitcoin")]
+    assert test_db.query(Coin).count() == 52
+    assert test_db.query(CoinSourceMapping).count() == 53
+    
+    # Resolving the same batch again is served entirely from the identity cache
+    assert CoinNormalizationService.resolve_batch(test_db, refs) == coin_ids
+
+
+def test_add_price_data_bulk_appends_without_orm_objects(test_db):
+    """Test that bulk price points are written as plain rows, NULLs included."""
+    coin = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coingecko", source_id="bitcoin"
+    )
+    points = [
+        PricePoint(coin_id=coin.id, source="coingecko", price_usd=50000.0 + i, market_cap_usd=None)
+        for i in range(100)
+    ]
+    
+    assert CoinNormalizationService.add_price_data_bulk(test_db, points) == 100
+    
+    rows = test_db.query(AssetPrice).order_by(AssetPrice.price_usd).all()
+    assert len(rows) == 100
+    assert rows[0].price_usd == 50000.0
+    assert rows[0].market_cap_usd is None
+    assert all(row.fetched_at is not None for row in rows)
+
+
+def test_latest_prices_follow_ingest_and_rebuild_from_history(test_db):
+    """Test the maintained current-price table, its consistency check and rebuild."""
+    coin = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coingecko", source_id="bitcoin"
+    )
+    now = datetime.utcnow()
+    CoinNormalizationService.add_price_data_bulk(test_db, [
+        PricePoint(coin.id, "coingecko", 100.0, fetched_at=now - timedelta(minutes=2)),
+        PricePoint(coin.id, "coingecko", 101.0, fetched_at=now - timedelta(minutes=1)),
+        PricePoint(coin.id, "coinpaprika", 99.0, fetched_at=now - timedelta(minutes=3)),
+    ])
+    # A late, older point must not roll the current price back
+    CoinNormalizationService.add_price_data_bulk(test_db, [
+        PricePoint(coin.id, "coingecko", 90.0, fetched_at=now - timedelta(minutes=10)),
+    ])
+    
+    assert CoinNormalizationService.get_latest_price(test_db, coin.id, "coingecko").price_usd == 101.0
+    assert CoinNormalizationService.get_latest_price(test_db, coin.id).price_usd == 101.0
+    assert verify_latest_prices(test_db)["consistent"]
+    
+    test_db.query(LatestPrice).delete()
+    test_db.commit()
+    assert verify_latest_prices(test_db)["missing"] == 2
+    
+    assert rebuild_latest_prices(test_db) == 2
+    assert verify_latest_prices(test_db)["consistent"]
+    assert CoinNormalizationService.get_latest_price(test_db, coin.id, "coinpaprika").price_usd == 99.0
@@ -0,0 +1,58 @@
+"""Tests for price history partition maintenance."""
+from datetime import date, datetime, timedelta
+from app.core.models import AssetPrice
+from app.services.normalization import CoinNormalizationService, PricePoint
+from app.services.partitions import (
+    drop_expired_partitions,
+    ensure_partitions,
+    list_partitions,
+    parse_partition,
+    partition_for,
+)
+
+
+def test_partition_ranges_round_trip_through_names():
+    """Test monthly/daily bounds, including year and month rollover."""
+    december = partition_for(date(2026, 12, 15), "month")
+    assert december.name == "asset_prices_p2026_12"
+    assert (december.start, december.end) == (date(2026, 12, 1), date(2027, 1, 1))
+    
+    leap_day = partition_for(date(2028, 2, 29), "day")
+    assert leap_day.end == date(2028, 3, 1)
+    
+    assert parse_partition(december.name) == december
+    assert parse_partition(leap_day.name) == leap_day
+    assert parse_partition("asset_prices_default") is None
+
+
+def test_asset_price_mapping_is_independent_of_backend():
+    """Test that the mapped key is id everywhere; only PostgreSQL DDL defers the composite key."""
+    from sqlalchemy.dialects import postgresql, sqlite
+    from sqlalchemy.schema import CreateTable
+    
+    assert [column.name for column in AssetPrice.__mapper__.primary_key] == ["id"]
+    assert "PRIMARY KEY (id)" in str(CreateTable(AssetPrice.__table__).compile(dialect=sqlite.dialect()))
+    assert "PRIMARY KEY" not in str(CreateTable(AssetPrice.__table__).compile(dialect=postgresql.dialect()))
+
+
+def test_partitions_are_created_ahead_and_dropped_by_retention(test_db):
+    """Test partition creation (moving rows out of the default partition) and retention."""
+    coin = CoinNormalizationService.get_or_create_coin(
+        test_db, symbol="BTC", name="Bitcoin", source="coingecko", source_id="bitcoin"
+    )
+    now = datetime(2026, 10, 18, 12, 0)
+    CoinNormalizationService.add_price_data_bulk(test_db, [
+        PricePoint(coin.id, "coingecko", 1.0, fetched_at=now - timedelta(days=400)),
+        PricePoint(coin.id, "coingecko", 2.0, fetched_at=now),
+    ])
+    
+    created = ensure_partitions(test_db, now=now - timedelta(days=400), ahead=0)
+    created += ensure_partitions(test_db, now=now, ahead=2)
+    
+    assert created == ["asset_prices_p2025_09", "asset_prices_p2026_10", "asset_prices_p2026_11", "asset_prices_p2026_12"]
+    assert ensure_partitions(test_db, now=now, ahead=2) == []
+    
+    assert drop_expired_partitions(test_db, retention_days=365, now=now) == ["asset_prices_p2025_09"]
+    assert [p.name for p in list_partitions(test_db)][0] == "asset_prices_p2026_10"
+    assert [price.price_usd for price in test_db.query(AssetPrice).all()] == [2.0]
+    assert CoinNormalizationService.get_latest_price(test_db, coin.id).price_usd == 2.0
@@ -0,0 +1,61 @@
+"""Tests for incremental JSON parsing and prefetching."""
+import json
+import pytest
+from app.ingestion.streaming import iter_json_array, iter_json_batches, prefetch
+
+
+def split_bytes(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_iter_json_array_handles_arbitrary_chunk_boundaries():
+    """Test that elements split across chunks (including multi-byte UTF-8) decode correctly."""
+    tickers = [
+        {"id": "btc-bitcoin", "name": "Bitcoin [BTC], \"digital gold\"", "quotes": {"USD": {"price": 50000.5}}},
+        {"id": "eur-euro", "name": "€uro ∑", "quotes": {"USD": {"price": 1.08}}},
+        12345,
+        [1, {"nested": "]"}],
+    ]
+    payload = json.dumps(tickers, ensure_ascii=False).encode("utf-8")
+    
+    for size in (1, 3, 7, 64):
+        assert list(iter_json_array(split_bytes(payload, size))) == tickers
+
+
+def test_iter_json_array_rejects_truncated_payload():
+    """Test that a truncated download raises instead of silently dropping data."""
+    payload = json.dumps([{"id": "a"}, {"id": "b"}]).encode()[:-5]
+    
+    with pytest.raises(ValueError):
+        list(iter_json_array(split_bytes(payload, 4)))
+
+
+def test_prefetched_batches_preserve_order():
+    """Test that prefetching keeps batch order and propagates the final partial batch."""
+    payload = json.dumps([{"id": i} for i in range(25)]).encode()
+    
+    batches = list(prefetch(iter_json_batches(split_bytes(payload, 16), 10), max_buffered=2))
+    
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [item["id"] for batch in batches for item in batch] == list(range(25))
+
+
+def test_iter_json_array_fuzzed_chunk_splits():
+    """Test that every split point, and random multi-way splits, decode like json.loads."""
+    import random
+    
+    documents = [
+        b'[456.7e3]',
+        b'[1, -2.5E-3 ,3e+2,0,true,false,null, "x"]',
+        b'[ 12 , 345.6 ]',
+        json.dumps([{"p": 1.5e-7}, -0.0, 10 ** 20, "\\u20ac", [1.25]]).encode(),
+    ]
+    rng = random.Random(7)
+    for document in documents:
+        expected = json.loads(document)
+        for i in range(1, len(document)):
+            assert list(iter_json_array([document[:i], document[i:]])) == expected
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(document)), min(4, len(document) - 1)))
+            chunks = [document[a:b] for a, b in zip([0] + cuts, cuts + [len(document)])]
+            assert list(iter_json_array(chunks)) == expected